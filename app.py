@@ -1,11 +1,23 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import pickle
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
+import os
+import json
+import hashlib
+import io
+import time
+import threading
 import plotly.graph_objects as go
 import plotly.express as px
+from rulenet import RuleNetClassifier, load_rules
+from flat_forest import FlatForest
+from lookup_forest import LookupForest
+from prediction_cache import PredictionCache
+from micro_batcher import MicroBatcher
+from scoring_jobs import JobServer
+from model_artifact import load_artifact, process_memory_report, format_memory_report
+from model_io import evaluation_path
+from feature_schema import CATEGORIES, FEATURE_COLUMNS, RecordEncoder, encode_frame
 
 # Page configuration
 st.set_page_config(
@@ -322,62 +334,148 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# RuleNet Classifier Class
-class RuleNetClassifier:
-    def __init__(self, rf_model):
-        self.rf_model = rf_model
+# Model resources (shared by all sessions in this server process)
+ARTIFACT_PATH = 'best_rf_model.rnf'
+MODEL_PATH = 'best_rf_model.pkl'
+RULES_PATH = 'rules.json'  # Optional rule table; built-in rules when absent
+USE_LOOKUP_ENGINE = True  # Cache forest outputs per (BMI interval, other features)
+JOBS_DIR = 'jobs'  # Background bulk-scoring jobs: status and results
+JOB_WORKERS = 2
 
-    def predict(self, X):
-        rule_preds = self.apply_rules(X)
-        final_preds = []
-        
-        for i in range(len(X)):
-            if rule_preds[i] != -1:
-                final_preds.append(rule_preds[i])
-            else:
-                pred = self.rf_model.predict([X[i]])[0]
-                final_preds.append(pred)
-        
-        return np.array(final_preds)
-    
-    def predict_proba(self, X):
-        probas = []
-        for i in range(len(X)):
-            rule_pred = self.apply_rules([X[i]])[0]
-            if rule_pred != -1:
-                # Rule-based prediction
-                if rule_pred == 1:
-                    probas.append([0.1, 0.9])  # High confidence for disease
-                else:
-                    probas.append([0.9, 0.1])  # High confidence for no disease
-            else:
-                # ML-based prediction
-                proba = self.rf_model.predict_proba([X[i]])[0]
-                probas.append(proba)
-        return np.array(probas)
+def artifact_mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
 
-    def apply_rules(self, X):
-        rule_preds = []
-        for row in X:
-            # Rule 1: High BMI and Poor Physical Health
-            if row[0] > 35 and row[4] > 15:
-                rule_preds.append(1)
-            # Rule 2: Smoking and Older Age
-            elif row[1] == 1 and row[8] >= 10:
-                rule_preds.append(1)
-            # Rule 3: Good Sleep and No Mental Health Issues
-            elif row[14] >= 8 and row[5] == 0:
-                rule_preds.append(0)
-            else:
-                rule_preds.append(-1)  # Defer to ML
-        return np.array(rule_preds)
+@st.cache_resource(max_entries=1, show_spinner="Loading model...")
+def load_model_resources(model_path, model_mtime, rules_mtime):
+    # The mtimes are part of the cache key, so rewriting an artifact on disk
+    # triggers a reload on the next rerun and evicts the stale copy
+    if model_mtime is None:
+        return None
+    if model_path.endswith('.rnf'):
+        # Tree arrays are read-only views of the mapped file, so every server
+        # process on the host shares one physical copy
+        forest, _ = load_artifact(model_path, mmap=True)
+    else:
+        with open(model_path, 'rb') as f:
+            rf_model = pickle.load(f)
+        # Single-row requests dominate here, where the flat evaluator is far
+        # cheaper than sklearn's per-estimator dispatch
+        forest = FlatForest.from_sklearn(rf_model)
+    if USE_LOOKUP_ENGINE:
+        forest = LookupForest(forest)
+    rules = load_rules(RULES_PATH) if rules_mtime is not None else None
+
+    memory = process_memory_report(model_path)
+    if memory is not None:
+        print(f"Loaded '{model_path}' - {format_memory_report(memory)}")
+    return RuleNetClassifier(forest, rules)
+
+@st.cache_resource
+def get_prediction_cache():
+    return PredictionCache(max_entries=10_000)
+
+# Prefer the memory-mappable artifact; fall back to the pickled forest
+model_path = ARTIFACT_PATH if os.path.exists(ARTIFACT_PATH) else MODEL_PATH
+model_mtime = artifact_mtime(model_path)
+rules_mtime = artifact_mtime(RULES_PATH)
+model = load_model_resources(model_path, model_mtime, rules_mtime)
+model_trained = model is not None
+# A reloaded artifact or rule table gets a new version, which invalidates cached predictions
+model_version = f"{model_path}@{model_mtime}:{RULES_PATH}@{rules_mtime}"
+prediction_cache = get_prediction_cache()
+
+@st.cache_resource(max_entries=1)
+def get_batcher(_model, model_version):
+    # Coalesces simultaneous submits from concurrent sessions into one call
+    return MicroBatcher(_model, max_batch_size=64, max_wait_ms=2.0)
 
-# Initialize session state
-if 'model' not in st.session_state:
-    # Create a Random Forest model (you'll need to load your trained model)
-    st.session_state.rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
-    st.session_state.model = RuleNetClassifier(st.session_state.rf_model)
-    st.session_state.model_trained = False
+batcher = get_batcher(model, model_version) if model_trained else None
+
+@st.cache_resource
+def job_server_slot():
+    return {'lock': threading.Lock(), 'version': None, 'server': None}
+
+def get_job_server(model_path, model_version):
+    # One job server per model version. The replaced server is shut down
+    # explicitly and exits once the jobs it already took have finished
+    slot = job_server_slot()
+    with slot['lock']:
+        if slot['version'] != model_version:
+            if slot['server'] is not None:
+                slot['server'].shutdown(wait=False)
+            rules_path = RULES_PATH if os.path.exists(RULES_PATH) else None
+            slot['server'] = JobServer(model_path, JOBS_DIR, workers=JOB_WORKERS,
+                                       rules_path=rules_path)
+            slot['version'] = model_version
+        return slot['server']
+
+@st.cache_data(max_entries=1)
+def load_evaluation(eval_path, eval_mtime):
+    # Written by evaluate_model.py; re-read only when the file changes
+    if eval_mtime is None:
+        return None
+    with open(eval_path) as f:
+        return json.load(f)
+
+@st.cache_resource(max_entries=1)
+def evaluation_figures(_evaluation, eval_mtime):
+    # Plotly figure construction is the costliest part of a rerun, so the
+    # figures are built once per results file rather than on every rerun
+    importances = _evaluation['feature_importances']['permutation_auc_drop']
+    top = sorted(importances.items(), key=lambda item: item[1], reverse=True)[:8]
+    features = [name for name, _ in top]
+    importance = [drop for _, drop in top]
+    
+    importance_fig = px.bar(x=importance, y=features, orientation='h',
+                            labels={'x': 'AUC Drop When Shuffled', 'y': 'Risk Factors'},
+                            title='Feature Importance Analysis',
+                            color=importance,
+                            color_continuous_scale='Reds')
+    importance_fig.update_layout(height=400, showlegend=False, yaxis={'autorange': 'reversed'})
+    
+    model_names = list(_evaluation['models'])
+    accuracies = [_evaluation['models'][name]['cv_accuracy_mean'] * 100 for name in model_names]
+    comparison_fig = px.bar(x=model_names, y=accuracies,
+                            error_y=[_evaluation['models'][name]['cv_accuracy_std'] * 100
+                                     for name in model_names],
+                            labels={'x': 'Models',
+                                    'y': f"Accuracy over {_evaluation['folds']} Holdout Partitions (%)"},
+                            title='Model Performance Comparison',
+                            color=accuracies,
+                            color_continuous_scale='Viridis')
+    comparison_fig.update_layout(height=400)
+    return importance_fig, comparison_fig
+
+@st.cache_resource(max_entries=1)
+def rule_stats_figures(_stats, model_version, calls):
+    # Rebuilt only when the model has scored new rows since the last rerun
+    rule_names = [rule['name'] for rule in _stats['rules']] + ['Deferred to Random Forest']
+    rule_rows = [rule['hits'] for rule in _stats['rules']] + [_stats['deferred_rows']]
+    rules_fig = px.bar(x=rule_rows, y=rule_names, orientation='h',
+                       labels={'x': 'Rows', 'y': ''},
+                       title='Rows Decided per Rule vs. Forest Deferrals',
+                       color=rule_rows, color_continuous_scale='Viridis')
+    rules_fig.update_layout(height=350)
+    
+    bucket_labels = [f"≤{b['le_ms']:g} ms" if b['le_ms'] is not None else "> 1 s"
+                     for b in _stats['rules_latency']['buckets']]
+    latency_fig = go.Figure()
+    latency_fig.add_trace(go.Bar(name='Rules', x=bucket_labels,
+                                 y=[b['count'] for b in _stats['rules_latency']['buckets']],
+                                 marker_color='#667eea'))
+    latency_fig.add_trace(go.Bar(name='Random Forest', x=bucket_labels,
+                                 y=[b['count'] for b in _stats['forest_latency']['buckets']],
+                                 marker_color='#f5576c'))
+    latency_fig.update_layout(title='Per-Call Latency: Rules vs. Random Forest', barmode='group',
+                              xaxis_title='Latency', yaxis_title='Calls', height=350)
+    return rules_fig, latency_fig
+
+eval_path = evaluation_path(model_path)
+eval_mtime = artifact_mtime(eval_path)
+evaluation = load_evaluation(eval_path, eval_mtime)
+if evaluation is not None:
+    evaluation['stale'] = evaluation['model']['mtime'] != model_mtime
+    importance_fig, comparison_fig = evaluation_figures(evaluation, eval_mtime)
 
 # Hero Section with Animation
 st.markdown("""
@@ -471,7 +569,8 @@ with st.sidebar:
     """, unsafe_allow_html=True)
 
 # Main content
-tab1, tab2, tab3 = st.tabs(["🏥 Risk Assessment", "📊 Model Information", "📈 Statistics"])
+tab1, tab2, tab3, tab4 = st.tabs(["🏥 Risk Assessment", "📊 Model Information", "📈 Statistics",
+                                  "📁 Bulk Upload"])
 
 with tab1:
     # Introduction Section
@@ -485,146 +584,129 @@ with tab1:
         </div>
     """, unsafe_allow_html=True)
     
-    col1, col2, col3 = st.columns(3)
+    # Inputs live in a form, so changing them does not rerun the script;
+    # only the submit button does
+    with st.form("patient_form"):
+        col1, col2, col3 = st.columns(3)
     
-    with col1:
-        st.markdown("""
-            <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                        padding: 15px; border-radius: 15px; margin-bottom: 20px;">
-                <h3 style="color: white; margin: 0; text-align: center;">📏 Physical Metrics</h3>
-            </div>
-        """, unsafe_allow_html=True)
+        with col1:
+            st.markdown("""
+                <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                            padding: 15px; border-radius: 15px; margin-bottom: 20px;">
+                    <h3 style="color: white; margin: 0; text-align: center;">📏 Physical Metrics</h3>
+                </div>
+            """, unsafe_allow_html=True)
         
-        bmi = st.number_input("💪 BMI (Body Mass Index)", min_value=10.0, max_value=60.0, value=25.0, step=0.1,
-                             help="Normal range: 18.5-24.9")
-        physical_health = st.slider("🏥 Physical Health (bad days/month)", 0, 30, 0,
-                                   help="Number of days physical health was not good")
-        mental_health = st.slider("🧠 Mental Health (bad days/month)", 0, 30, 0,
-                                 help="Number of days mental health was not good")
-        sleep_time = st.slider("😴 Average Sleep Time (hours)", 0, 24, 7,
-                              help="Recommended: 7-9 hours")
+            bmi = st.number_input("💪 BMI (Body Mass Index)", min_value=10.0, max_value=60.0, value=25.0, step=0.1,
+                                 help="Normal range: 18.5-24.9")
+            physical_health = st.slider("🏥 Physical Health (bad days/month)", 0, 30, 0,
+                                       help="Number of days physical health was not good")
+            mental_health = st.slider("🧠 Mental Health (bad days/month)", 0, 30, 0,
+                                     help="Number of days mental health was not good")
+            sleep_time = st.slider("😴 Average Sleep Time (hours)", 0, 24, 7,
+                                  help="Recommended: 7-9 hours")
         
-    with col2:
-        st.markdown("""
-            <div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); 
-                        padding: 15px; border-radius: 15px; margin-bottom: 20px;">
-                <h3 style="color: white; margin: 0; text-align: center;">🚭 Lifestyle Factors</h3>
-            </div>
-        """, unsafe_allow_html=True)
+        with col2:
+            st.markdown("""
+                <div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); 
+                            padding: 15px; border-radius: 15px; margin-bottom: 20px;">
+                    <h3 style="color: white; margin: 0; text-align: center;">🚭 Lifestyle Factors</h3>
+                </div>
+            """, unsafe_allow_html=True)
         
-        smoking = st.selectbox("🚬 Do you smoke?", ["No", "Yes"],
-                              help="Current smoking status")
-        alcohol = st.selectbox("🍺 Heavy Alcohol Consumption?", ["No", "Yes"],
-                              help="More than 14 drinks/week for men, 7 for women")
-        physical_activity = st.selectbox("🏃 Physically Active?", ["Yes", "No"],
-                                        help="Exercise in past month excluding job")
-        diff_walking = st.selectbox("🚶 Difficulty Walking?", ["No", "Yes"],
-                                   help="Serious difficulty walking or climbing stairs")
+            smoking = st.selectbox("🚬 Do you smoke?", ["No", "Yes"],
+                                  help="Current smoking status")
+            alcohol = st.selectbox("🍺 Heavy Alcohol Consumption?", ["No", "Yes"],
+                                  help="More than 14 drinks/week for men, 7 for women")
+            physical_activity = st.selectbox("🏃 Physically Active?", ["Yes", "No"],
+                                            help="Exercise in past month excluding job")
+            diff_walking = st.selectbox("🚶 Difficulty Walking?", ["No", "Yes"],
+                                       help="Serious difficulty walking or climbing stairs")
         
-    with col3:
-        st.markdown("""
-            <div style="background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); 
-                        padding: 15px; border-radius: 15px; margin-bottom: 20px;">
-                <h3 style="color: white; margin: 0; text-align: center;">🏥 Medical History</h3>
-            </div>
-        """, unsafe_allow_html=True)
+        with col3:
+            st.markdown("""
+                <div style="background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); 
+                            padding: 15px; border-radius: 15px; margin-bottom: 20px;">
+                    <h3 style="color: white; margin: 0; text-align: center;">🏥 Medical History</h3>
+                </div>
+            """, unsafe_allow_html=True)
         
-        stroke = st.selectbox("🧠 Ever had a Stroke?", ["No", "Yes"])
-        diabetic = st.selectbox("💉 Diabetic Status", 
-                               ["No", "No, borderline diabetes", "Yes", "Yes (during pregnancy)"])
-        asthma = st.selectbox("🫁 Have Asthma?", ["No", "Yes"])
-        kidney_disease = st.selectbox("🫘 Kidney Disease?", ["No", "Yes"])
-        skin_cancer = st.selectbox("🩺 Skin Cancer?", ["No", "Yes"])
+            stroke = st.selectbox("🧠 Ever had a Stroke?", ["No", "Yes"])
+            diabetic = st.selectbox("💉 Diabetic Status", 
+                                   ["No", "No, borderline diabetes", "Yes", "Yes (during pregnancy)"])
+            asthma = st.selectbox("🫁 Have Asthma?", ["No", "Yes"])
+            kidney_disease = st.selectbox("🫘 Kidney Disease?", ["No", "Yes"])
+            skin_cancer = st.selectbox("🩺 Skin Cancer?", ["No", "Yes"])
         
-    col4, col5 = st.columns(2)
+        col4, col5 = st.columns(2)
     
-    with col4:
-        st.markdown("""
-            <div style="background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%); 
-                        padding: 15px; border-radius: 15px; margin-bottom: 20px;">
-                <h3 style="color: #333; margin: 0; text-align: center;">👤 Demographics</h3>
-            </div>
-        """, unsafe_allow_html=True)
+        with col4:
+            st.markdown("""
+                <div style="background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%); 
+                            padding: 15px; border-radius: 15px; margin-bottom: 20px;">
+                    <h3 style="color: #333; margin: 0; text-align: center;">👤 Demographics</h3>
+                </div>
+            """, unsafe_allow_html=True)
         
-        sex = st.selectbox("⚧️ Sex", ["Male", "Female"])
-        age_category = st.selectbox("🎂 Age Category", [
-            "18-24", "25-29", "30-34", "35-39", "40-44",
-            "45-49", "50-54", "55-59", "60-64", "65-69",
-            "70-74", "75-79", "80 or older"
-        ])
+            sex = st.selectbox("⚧️ Sex", ["Male", "Female"])
+            age_category = st.selectbox("🎂 Age Category", CATEGORIES['AgeCategory'])
         
-    with col5:
-        st.markdown("""
-            <div style="background: linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%); 
-                        padding: 15px; border-radius: 15px; margin-bottom: 20px;">
-                <h3 style="color: #333; margin: 0; text-align: center;">🌍 General Health</h3>
-            </div>
-        """, unsafe_allow_html=True)
+        with col5:
+            st.markdown("""
+                <div style="background: linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%); 
+                            padding: 15px; border-radius: 15px; margin-bottom: 20px;">
+                    <h3 style="color: #333; margin: 0; text-align: center;">🌍 General Health</h3>
+                </div>
+            """, unsafe_allow_html=True)
         
-        race = st.selectbox("🌎 Race/Ethnicity", [
-            "White", "Black", "Asian", "American Indian/Alaskan Native",
-            "Hispanic", "Other"
-        ])
-        gen_health = st.selectbox("💚 General Health", [
-            "Excellent", "Very good", "Good", "Fair", "Poor"
-        ])
+            race = st.selectbox("🌎 Race/Ethnicity", CATEGORIES['Race'])
+            gen_health = st.selectbox("💚 General Health", CATEGORIES['GenHealth'])
     
-    st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown("<br>", unsafe_allow_html=True)
     
-    # Enhanced Predict button with animation
-    st.markdown("""
-        <div style="text-align: center; margin: 40px 0;">
-            <style>
-                @keyframes glow {
-                    0%, 100% {box-shadow: 0 0 20px rgba(102, 126, 234, 0.5);}
-                    50% {box-shadow: 0 0 40px rgba(102, 126, 234, 0.8);}
-                }
-            </style>
-        </div>
-    """, unsafe_allow_html=True)
+        # Enhanced Predict button with animation
+        st.markdown("""
+            <div style="text-align: center; margin: 40px 0;">
+                <style>
+                    @keyframes glow {
+                        0%, 100% {box-shadow: 0 0 20px rgba(102, 126, 234, 0.5);}
+                        50% {box-shadow: 0 0 40px rgba(102, 126, 234, 0.8);}
+                    }
+                </style>
+            </div>
+        """, unsafe_allow_html=True)
     
-    col_center = st.columns([2, 1, 2])[1]
-    with col_center:
-        predict_button = st.button("🔍 ANALYZE RISK NOW", use_container_width=True)
+        col_center = st.columns([2, 1, 2])[1]
+        with col_center:
+            predict_button = st.form_submit_button("🔍 ANALYZE RISK NOW", use_container_width=True)
     
     if predict_button:
-        # Encode inputs (simplified - you should use your actual encoders)
-        input_data = pd.DataFrame({
-            'BMI': [bmi],
-            'Smoking': [1 if smoking == "Yes" else 0],
-            'AlcoholDrinking': [1 if alcohol == "Yes" else 0],
-            'Stroke': [1 if stroke == "Yes" else 0],
-            'PhysicalHealth': [physical_health],
-            'MentalHealth': [mental_health],
-            'DiffWalking': [1 if diff_walking == "Yes" else 0],
-            'Sex': [0 if sex == "Female" else 1],
-            'AgeCategory': [["18-24", "25-29", "30-34", "35-39", "40-44", "45-49", 
-                           "50-54", "55-59", "60-64", "65-69", "70-74", "75-79", 
-                           "80 or older"].index(age_category)],
-            'Race': [["White", "Black", "Asian", "American Indian/Alaskan Native", 
-                     "Hispanic", "Other"].index(race)],
-            'Diabetic': [0 if diabetic == "No" else 1 if diabetic == "Yes" else 2 if diabetic == "No, borderline diabetes" else 3],
-            'PhysicalActivity': [1 if physical_activity == "Yes" else 0],
-            'GenHealth': [["Excellent", "Very good", "Good", "Fair", "Poor"].index(gen_health)],
-            'SleepTime': [sleep_time],
-            'Asthma': [1 if asthma == "Yes" else 0],
-            'KidneyDisease': [1 if kidney_disease == "Yes" else 0],
-            'SkinCancer': [1 if skin_cancer == "Yes" else 0]
+        # Category codes come from feature_schema, shared with training and bulk
+        # scoring. Each session reuses one preallocated row; the prediction
+        # below completes before the next submit overwrites it
+        if 'record_encoder' not in st.session_state:
+            st.session_state['record_encoder'] = RecordEncoder(capacity=1)
+        X = st.session_state['record_encoder'].encode({
+            'BMI': bmi, 'Smoking': smoking, 'AlcoholDrinking': alcohol, 'Stroke': stroke,
+            'PhysicalHealth': physical_health, 'MentalHealth': mental_health,
+            'DiffWalking': diff_walking, 'Sex': sex, 'AgeCategory': age_category, 'Race': race,
+            'Diabetic': diabetic, 'PhysicalActivity': physical_activity, 'GenHealth': gen_health,
+            'SleepTime': sleep_time, 'Asthma': asthma, 'KidneyDisease': kidney_disease,
+            'SkinCancer': skin_cancer,
         })
         
-        # For demonstration, create a simple prediction
-        # In production, you would load your actual trained model
-        X = input_data.values
-        
-        # Simple rule-based prediction for demonstration
-        risk_score = 0
-        if bmi > 30: risk_score += 0.2
-        if smoking == "Yes": risk_score += 0.25
-        if stroke == "Yes": risk_score += 0.3
-        if physical_health > 15: risk_score += 0.15
-        if int(age_category.split("-")[0] if "-" in age_category else "80") > 50: risk_score += 0.1
+        if model_trained:
+            probability = float(prediction_cache.predict_proba(batcher, X, model_version)[0][1])
+        else:
+            # Simple rule-based prediction when no trained model is available
+            risk_score = 0
+            if bmi > 30: risk_score += 0.2
+            if smoking == "Yes": risk_score += 0.25
+            if stroke == "Yes": risk_score += 0.3
+            if physical_health > 15: risk_score += 0.15
+            if int(age_category.split("-")[0] if "-" in age_category else "80") > 50: risk_score += 0.1
+            probability = min(risk_score, 0.99)
         
-        probability = min(risk_score, 0.99)
         prediction = 1 if probability > 0.5 else 0
         
         # Display Enhanced results with animations
@@ -860,22 +942,35 @@ with tab2:
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("""
-        <div class="info-box">
-        <h3>Model Performance</h3>
-        <ul>
-            <li><strong>Test Accuracy:</strong> 94.21%</li>
-            <li><strong>Cross-Validation:</strong> 94.23%</li>
-            <li><strong>Precision:</strong> 96.19%</li>
-            <li><strong>Recall:</strong> 92.06%</li>
-            <li><strong>F1-Score:</strong> 94.09%</li>
-            <li><strong>AUC-ROC:</strong> 0.98</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
+        if evaluation is not None:
+            rulenet_eval = evaluation['models']['RuleNet']
+            st.markdown(f"""
+            <div class="info-box">
+            <h3>Model Performance</h3>
+            <ul>
+                <li><strong>Holdout Accuracy:</strong> {rulenet_eval['accuracy']:.2%}</li>
+                <li><strong>Accuracy over {evaluation['folds']} Holdout Partitions:</strong> {rulenet_eval['cv_accuracy_mean']:.2%} ± {rulenet_eval['cv_accuracy_std']:.2%}</li>
+                <li><strong>Precision:</strong> {rulenet_eval['precision']:.2%}</li>
+                <li><strong>Recall:</strong> {rulenet_eval['recall']:.2%}</li>
+                <li><strong>F1-Score:</strong> {rulenet_eval['f1']:.2%}</li>
+                <li><strong>AUC-ROC:</strong> {rulenet_eval['auc']:.3f}</li>
+            </ul>
+            <p><small>Evaluated {evaluation['created']} on {evaluation['holdout']['path']} ({evaluation['holdout']['rows']:,} rows)</small></p>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.info("No evaluation results yet. Run `python evaluate_model.py --holdout <file>` "
+                    "to compute them for the deployed model.")
+        if evaluation is not None and evaluation.get('stale'):
+            st.warning("The model artifact changed after these results were computed; "
+                       "re-run `evaluate_model.py`.")
         
     with col2:
-        st.markdown("""
+        # evaluate_model.py scores a fixed model on a holdout; nothing is refit per fold
+        validation = (f"{evaluation['holdout']['rows']:,}-row holdout, "
+                      f"{evaluation['folds']} stratified partitions"
+                      if evaluation is not None else "Not evaluated yet")
+        st.markdown(f"""
         <div class="info-box">
         <h3>Dataset Information</h3>
         <ul>
@@ -883,25 +978,18 @@ with tab2:
             <li><strong>Total Records:</strong> 319,795</li>
             <li><strong>Features:</strong> 17</li>
             <li><strong>Balancing:</strong> SMOTE</li>
-            <li><strong>Validation:</strong> 5-Fold CV</li>
+            <li><strong>Validation:</strong> {validation}</li>
         </ul>
         </div>
         """, unsafe_allow_html=True)
     
     st.markdown("### 🔍 Top Risk Factors")
     
-    # Feature importance chart
-    features = ['BMI', 'Physical Health', 'Age Category', 'General Health', 
-                'Stroke', 'Mental Health', 'Diabetic', 'Difficulty Walking']
-    importance = [0.142, 0.128, 0.115, 0.097, 0.089, 0.078, 0.072, 0.068]
-    
-    fig = px.bar(x=importance, y=features, orientation='h',
-                 labels={'x': 'Importance Score', 'y': 'Risk Factors'},
-                 title='Feature Importance Analysis',
-                 color=importance,
-                 color_continuous_scale='Reds')
-    fig.update_layout(height=400, showlegend=False)
-    st.plotly_chart(fig, use_container_width=True)
+    # Feature importance chart (permutation importances on the holdout)
+    if evaluation is not None:
+        st.plotly_chart(importance_fig, use_container_width=True)
+    else:
+        st.info("Feature importances are computed by `evaluate_model.py`.")
     
     st.markdown("""
     <div class="info-box">
@@ -914,67 +1002,200 @@ with tab2:
     """, unsafe_allow_html=True)
 
 with tab3:
-    st.markdown("## 📈 Model Statistics & Comparison")
-    
-    # Model comparison
-    models = ['RuleNet', 'Random Forest', 'XGBoost', 'KNN', 'Decision Tree', 
-              'Logistic Regression', 'SVM', 'Naive Bayes']
-    accuracies = [94.23, 94.05, 93.80, 92.18, 91.16, 91.50, 91.44, 91.54]
-    
-    fig = px.bar(x=models, y=accuracies,
-                 labels={'x': 'Models', 'y': 'Cross-Validation Accuracy (%)'},
-                 title='Model Performance Comparison',
-                 color=accuracies,
-                 color_continuous_scale='Viridis')
-    fig.update_layout(height=400)
-    st.plotly_chart(fig, use_container_width=True)
-    
-    col1, col2, col3, col4 = st.columns(4)
+    st.markdown("## 📈 Model Statistics")
     
-    with col1:
-        st.markdown("""
-        <div class="metric-card">
-            <h2 style="color: #667eea;">94.21%</h2>
-            <p>Test Accuracy</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class="metric-card">
-            <h2 style="color: #f093fb;">92.06%</h2>
-            <p>Recall (Sensitivity)</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div class="metric-card">
-            <h2 style="color: #4facfe;">96.19%</h2>
-            <p>Precision</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown("""
-        <div class="metric-card">
-            <h2 style="color: #f5576c;">0.98</h2>
-            <p>AUC-ROC Score</p>
+    if evaluation is not None:
+        # Model comparison on the holdout
+        st.plotly_chart(comparison_fig, use_container_width=True)
+        
+        rulenet_eval = evaluation['models']['RuleNet']
+        col1, col2, col3, col4 = st.columns(4)
+        cards = [
+            (col1, "#667eea", f"{rulenet_eval['accuracy']:.2%}", "Holdout Accuracy"),
+            (col2, "#f093fb", f"{rulenet_eval['recall']:.2%}", "Recall (Sensitivity)"),
+            (col3, "#4facfe", f"{rulenet_eval['precision']:.2%}", "Precision"),
+            (col4, "#f5576c", f"{rulenet_eval['auc']:.3f}", "AUC-ROC Score"),
+        ]
+        for col, color, value, label in cards:
+            with col:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <h2 style="color: {color};">{value}</h2>
+                    <p>{label}</p>
+                </div>
+                """, unsafe_allow_html=True)
+    else:
+        st.info("Holdout metrics appear here after running `python evaluate_model.py`.")
+    
+    # Live RuleNet instrumentation (shared by all sessions in this server process)
+    st.markdown("### ⚡ Live Rule Engine Statistics")
+    if not model_trained:
+        st.info("Rule statistics are collected once a trained model is loaded.")
+    else:
+        stats = model.rule_stats()
+        st.caption("Counted since the model was loaded, across all sessions. "
+                   "Predictions answered from the prediction cache are not counted.")
+
+        col1, col2, col3, col4 = st.columns(4)
+        cards = [
+            (col1, "#667eea", f"{stats['rows']:,}", "Rows Scored"),
+            (col2, "#f093fb", f"{1 - stats['deferral_rate']:.1%}" if stats['rows'] else "—",
+             "Short-Circuited by Rules"),
+            (col3, "#4facfe", f"{stats['rules_latency']['mean_ms']:.3f} ms", "Mean Rules Time / Call"),
+            (col4, "#f5576c", f"{stats['forest_latency']['mean_ms']:.3f} ms", "Mean Forest Time / Call"),
+        ]
+        for col, color, value, label in cards:
+            with col:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <h2 style="color: {color};">{value}</h2>
+                    <p>{label}</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+        rules_fig, latency_fig = rule_stats_figures(stats, model_version, stats['calls'])
+        st.plotly_chart(rules_fig, use_container_width=True)
+        st.plotly_chart(latency_fig, use_container_width=True)
+
+        st.dataframe(pd.DataFrame([
+            {'Rule': rule['name'], 'Outcome': 'Disease' if rule['outcome'] else 'No Disease',
+             'Hits': rule['hits'], 'Hit Rate': f"{rule['hit_rate']:.1%}",
+             'Est. Forest Time Saved (ms)': round(rule['estimated_forest_seconds_saved'] * 1e3, 2)}
+            for rule in stats['rules']
+        ]), use_container_width=True, hide_index=True)
+
+    if evaluation is not None:
+        st.markdown(f"""
+        <div class="info-box">
+        <h3>🎯 Why RuleNet Performs Best?</h3>
+        <ul>
+            <li><strong>Hybrid Architecture:</strong> Combines medical rules with machine learning</li>
+            <li><strong>High Interpretability:</strong> Doctors can understand the reasoning</li>
+            <li><strong>Balanced Performance:</strong> Excellent precision and recall</li>
+            <li><strong>Low False Negatives:</strong> Only {rulenet_eval['miss_rate']:.2%} miss rate for disease cases</li>
+            <li><strong>Stable:</strong> {rulenet_eval['cv_accuracy_std']:.2%} standard deviation across holdout partitions</li>
+        </ul>
         </div>
         """, unsafe_allow_html=True)
-    
+
+with tab4:
     st.markdown("""
-    <div class="info-box">
-    <h3>🎯 Why RuleNet Performs Best?</h3>
-    <ul>
-        <li><strong>Hybrid Architecture:</strong> Combines medical rules with machine learning</li>
-        <li><strong>High Interpretability:</strong> Doctors can understand the reasoning</li>
-        <li><strong>Balanced Performance:</strong> Excellent precision and recall</li>
-        <li><strong>Low False Negatives:</strong> Only 7.94% miss rate for disease cases</li>
-        <li><strong>Stable:</strong> 0.06% standard deviation across validation folds</li>
-    </ul>
-    </div>
+        <div class="info-box">
+            <h2 style="color: #667eea; margin-top: 0;">📁 Bulk Patient Scoring</h2>
+            <p style="font-size: 1.1em; color: #555;">
+                Upload a CSV with one patient per row to score the whole file at once.
+                Values use the same wording as the assessment form (e.g. <em>Yes</em>/<em>No</em>,
+                <em>60-64</em>, <em>Very good</em>); numeric codes are accepted too.
+                Extra columns are kept in the results, followed by <em>RiskProbability</em>
+                and <em>Prediction</em> (1 = elevated risk, 0 = low risk).
+            </p>
+        </div>
     """, unsafe_allow_html=True)
+    st.caption("Required columns: " + ", ".join(FEATURE_COLUMNS))
+    
+    uploaded_file = st.file_uploader("Patient CSV", type=["csv"])
+    background = st.checkbox("Run as a background job",
+                             help="Scores the file in a separate worker process; the page stays "
+                                  "usable and the job keeps running if you leave.")
+    
+    if uploaded_file is not None and not model_trained:
+        st.warning("Bulk scoring needs a trained model; no model file was found.")
+    elif uploaded_file is not None and background:
+        job_server = get_job_server(model_path, model_version)
+        file_bytes = uploaded_file.getvalue()
+        digest = hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+        
+        # One job per upload and model version; reruns only poll its status
+        if st.session_state.get('bulk_job_key') != (digest, model_version):
+            upload_path = os.path.join(JOBS_DIR, 'uploads', f"{digest}.csv")
+            os.makedirs(os.path.dirname(upload_path), exist_ok=True)
+            with open(upload_path, 'wb') as f:
+                f.write(file_bytes)
+            st.session_state['bulk_job_id'] = job_server.submit(upload_path)
+            st.session_state['bulk_job_key'] = (digest, model_version)
+        
+        job = job_server.status(st.session_state['bulk_job_id'])
+        rows_total = f"{job['rows_total']:,}" if job['rows_total'] is not None else "?"
+        rate = f", {job['rows_per_sec']:,.0f} rows/sec" if job['rows_per_sec'] else ""
+        st.progress(int(job['progress']),
+                    text=f"Job {job['job_id']}: {job['state']} - "
+                         f"{job['rows_done']:,} / {rows_total} rows{rate}")
+        
+        if job['state'] in ('queued', 'running'):
+            if job.get('eta_seconds') is not None:
+                st.caption(f"About {job['eta_seconds']:.0f} s remaining.")
+            st.button("🔄 Refresh Status")
+        elif job['state'] == 'failed':
+            st.error(f"The job failed: {job['error']}")
+        else:
+            with open(job['output'], 'rb') as f:
+                st.download_button("⬇️ Download Results (CSV)", f.read(),
+                                   file_name=os.path.splitext(uploaded_file.name)[0] + "_scored.csv",
+                                   mime="text/csv", use_container_width=True)
+    elif uploaded_file is not None:
+        file_bytes = uploaded_file.getvalue()
+        upload_key = (hashlib.blake2b(file_bytes, digest_size=16).hexdigest(), model_version)
+        
+        # Scored once per upload and model version; the download button's
+        # rerun reuses the stored result instead of rescoring the file
+        if st.session_state.get('bulk_key') != upload_key:
+            st.session_state.pop('bulk_result', None)
+            progress = st.progress(0, text="Reading file...")
+            try:
+                patients = pd.read_csv(io.BytesIO(file_bytes))
+                progress.progress(20, text=f"Validating and encoding {len(patients):,} rows...")
+                X = encode_frame(patients)
+            except (ValueError, pd.errors.ParserError) as exc:
+                progress.empty()
+                st.error(f"Could not read this file: {exc}")
+                X = None
+            
+            if X is not None:
+                progress.progress(40, text=f"Scoring {len(X):,} patients...")
+                start = time.perf_counter()
+                probas = model.predict_proba(X)
+                elapsed = time.perf_counter() - start
+                
+                progress.progress(80, text="Preparing results...")
+                patients['RiskProbability'] = probas[:, 1]
+                # 1 = elevated risk, as in the background job and score_batch.py output
+                patients['Prediction'] = (probas[:, 1] > 0.5).astype(int)
+                st.session_state['bulk_result'] = {
+                    'patients': patients,
+                    'csv': patients.to_csv(index=False).encode(),
+                    'seconds': elapsed,
+                }
+                st.session_state['bulk_key'] = upload_key
+                progress.progress(100, text="Done")
+        
+        result = st.session_state.get('bulk_result')
+        if result is not None:
+            patients = result['patients']
+            elevated = int((patients['RiskProbability'] > 0.5).sum())
+            
+            col1, col2, col3 = st.columns(3)
+            cards = [
+                (col1, "#667eea", f"{len(patients):,}", "Patients Scored"),
+                (col2, "#f5576c", f"{elevated:,} ({elevated / max(len(patients), 1):.1%})", "Elevated Risk"),
+                (col3, "#4facfe", f"{result['seconds']:.2f} s", "Scoring Time"),
+            ]
+            for col, color, value, label in cards:
+                with col:
+                    st.markdown(f"""
+                    <div class="metric-card">
+                        <h2 style="color: {color};">{value}</h2>
+                        <p>{label}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+            
+            st.dataframe(patients.head(1_000), use_container_width=True, hide_index=True)
+            if len(patients) > 1_000:
+                st.caption(f"Showing the first 1,000 of {len(patients):,} rows; "
+                           "the download contains all of them.")
+            
+            st.download_button("⬇️ Download Results (CSV)", result['csv'],
+                               file_name=os.path.splitext(uploaded_file.name)[0] + "_scored.csv",
+                               mime="text/csv", use_container_width=True)
 
 # Footer
 st.markdown("---")
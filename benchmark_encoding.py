@@ -0,0 +1,199 @@
+"""
+Feature encoding benchmark: the DataFrame paths against the NumPy record
+encoders in feature_schema.
+Single records compare the tab1 form's previous encoding (a 17-column
+DataFrame of scalar lists with list.index() lookups, then .values) and
+encode_frame on a one-row DataFrame with encode_record and a reused
+RecordEncoder buffer. Small batches compare encode_frame on
+DataFrame.from_records with encode_records and RecordEncoder.encode_many.
+Large batches compare encode_frame with encode_columns on an Arrow table and
+a structured NumPy array, against copying a float32 matrix of the same size
+(the memory-bandwidth floor). Every path is checked to produce the same
+feature matrix.
+
+Usage: python benchmark_encoding.py
+       python benchmark_encoding.py --batch-sizes 1 8 64 512 --output encoding.json
+       python benchmark_encoding.py --columnar-rows 5000000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_schema import (
+    CATEGORIES, FEATURE_COLUMNS, FEATURE_DTYPES, YES_NO_COLUMNS, RecordEncoder, encode_columns,
+    encode_frame, encode_record, encode_records,
+)
+from synthetic_data import generate
+
+DEFAULT_BATCH_SIZES = [1, 8, 32, 64, 256, 1_024]
+
+
+def make_frame(n, seed):
+    """BRFSS-style DataFrame (labels, not codes) for n synthetic patients."""
+    X, _ = generate(n, seed=seed)
+    frame = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+    for name, labels in CATEGORIES.items():
+        frame[name] = np.array(labels, dtype=object)[frame[name].astype(int)]
+    for name in YES_NO_COLUMNS:
+        frame[name] = np.where(frame[name] == 1, 'Yes', 'No')
+    return frame
+
+
+def make_records(n, seed):
+    """Form-style records (labels, not codes) for n synthetic patients."""
+    return make_frame(n, seed).to_dict('records')
+
+
+def bench_columnar(n_rows, seed):
+    """Milliseconds to build the feature matrix from n_rows of columnar input."""
+    import pyarrow as pa
+
+    frame = make_frame(n_rows, seed)
+    codes, _ = generate(n_rows, seed=seed)
+    # Pre-encoded input in the training storage dtypes (float32 / int8)
+    structured = np.empty(n_rows, dtype=[(name, FEATURE_DTYPES[name]) for name in FEATURE_COLUMNS])
+    for j, name in enumerate(FEATURE_COLUMNS):
+        structured[name] = codes[:, j]
+    code_frame = pd.DataFrame({name: structured[name] for name in FEATURE_COLUMNS})
+    label_table = pa.Table.from_pandas(frame, preserve_index=False)
+    code_table = pa.table({name: structured[name] for name in FEATURE_COLUMNS})
+
+    reference = encode_frame(frame).astype(np.float32)
+    for data in (label_table, code_table, structured):
+        assert np.array_equal(encode_columns(data), reference)
+
+    floor = np.empty_like(reference)
+    paths = {
+        'labels_encode_frame': lambda: encode_frame(frame),
+        'labels_arrow_encode_columns': lambda: encode_columns(label_table),
+        'codes_dataframe_values': lambda: code_frame.values.astype(np.float32),
+        'codes_arrow_encode_columns': lambda: encode_columns(code_table),
+        'codes_structured_encode_columns': lambda: encode_columns(structured),
+        'float32_matrix_copy': lambda: np.copyto(floor, reference),
+    }
+    return {name: time_call(lambda _: fn(), None, min_seconds=1.0) / 1e3
+            for name, fn in paths.items()}
+
+
+def legacy_form_encode(r):
+    """The tab1 encoding before feature_schema, kept here as the baseline.
+
+    Its Diabetic codes are corrected to the training order (it swapped 'Yes'
+    and borderline), so its output can be checked against the encoders.
+    """
+    input_data = pd.DataFrame({
+        'BMI': [r['BMI']],
+        'Smoking': [1 if r['Smoking'] == "Yes" else 0],
+        'AlcoholDrinking': [1 if r['AlcoholDrinking'] == "Yes" else 0],
+        'Stroke': [1 if r['Stroke'] == "Yes" else 0],
+        'PhysicalHealth': [r['PhysicalHealth']],
+        'MentalHealth': [r['MentalHealth']],
+        'DiffWalking': [1 if r['DiffWalking'] == "Yes" else 0],
+        'Sex': [0 if r['Sex'] == "Female" else 1],
+        'AgeCategory': [["18-24", "25-29", "30-34", "35-39", "40-44", "45-49",
+                         "50-54", "55-59", "60-64", "65-69", "70-74", "75-79",
+                         "80 or older"].index(r['AgeCategory'])],
+        'Race': [["White", "Black", "Asian", "American Indian/Alaskan Native",
+                  "Hispanic", "Other"].index(r['Race'])],
+        'Diabetic': [0 if r['Diabetic'] == "No" else 1 if r['Diabetic'] == "No, borderline diabetes"
+                     else 2 if r['Diabetic'] == "Yes" else 3],
+        'PhysicalActivity': [1 if r['PhysicalActivity'] == "Yes" else 0],
+        'GenHealth': [["Excellent", "Very good", "Good", "Fair", "Poor"].index(r['GenHealth'])],
+        'SleepTime': [r['SleepTime']],
+        'Asthma': [1 if r['Asthma'] == "Yes" else 0],
+        'KidneyDisease': [1 if r['KidneyDisease'] == "Yes" else 0],
+        'SkinCancer': [1 if r['SkinCancer'] == "Yes" else 0]
+    })
+    return input_data.values
+
+
+def time_call(fn, arg, min_seconds=0.2):
+    """Median microseconds per call over repeated timing rounds."""
+    fn(arg)  # warm up
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn(arg)
+        if time.perf_counter() - start >= min_seconds / 5:
+            break
+        calls *= 2
+    rounds = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn(arg)
+        rounds.append((time.perf_counter() - start) / calls)
+    return float(np.median(rounds)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feature encoding paths")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES)
+    parser.add_argument('--columnar-rows', type=int, default=1_000_000,
+                        help="Rows for the large-batch columnar comparison")
+    parser.add_argument('--seed', type=int, default=7, help="Seed for the benchmark records")
+    parser.add_argument('--output', default='benchmark_encoding.json', help="JSON results file")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  FEATURE ENCODING BENCHMARK")
+    print("=" * 70)
+
+    records = make_records(max(args.batch_sizes), args.seed)
+    encoder = RecordEncoder(capacity=max(args.batch_sizes))
+
+    # Every path must produce the same matrix
+    reference = encode_frame(pd.DataFrame.from_records(records))
+    assert np.array_equal(np.vstack([legacy_form_encode(r) for r in records[:100]]),
+                          reference[:100])
+    assert np.array_equal(encode_records(records), reference)
+    assert np.array_equal(encoder.encode_many(records), reference)
+    assert np.array_equal(encode_record(records[0]), reference[:1])
+
+    print("\n[1/3] Single record (µs per call)...")
+    record = records[0]
+    single = {
+        'legacy_form_dataframe': time_call(legacy_form_encode, record),
+        'encode_frame_dataframe': time_call(lambda r: encode_frame(pd.DataFrame([r])), record),
+        'encode_record': time_call(encode_record, record),
+        'record_encoder_buffer': time_call(encoder.encode, record),
+    }
+    for name, micros in single.items():
+        print(f"  {name:<24} {micros:>10.2f} µs  "
+              f"({single['legacy_form_dataframe'] / micros:>6.1f}x vs legacy)")
+
+    print("\n[2/3] Small batches (µs per batch)...")
+    batches = []
+    for batch_size in args.batch_sizes:
+        batch = records[:batch_size]
+        entry = {
+            'batch_size': batch_size,
+            'encode_frame_dataframe': time_call(
+                lambda b: encode_frame(pd.DataFrame.from_records(b)), batch),
+            'encode_records': time_call(encode_records, batch),
+            'record_encoder_buffer': time_call(encoder.encode_many, batch),
+        }
+        batches.append(entry)
+        print(f"  batch {batch_size:>6,}: DataFrame {entry['encode_frame_dataframe']:>10.1f} | "
+              f"encode_records {entry['encode_records']:>10.1f} | "
+              f"buffer {entry['record_encoder_buffer']:>10.1f}")
+
+    print(f"\n[3/3] Columnar input, {args.columnar_rows:,} rows (ms per batch)...")
+    columnar = bench_columnar(args.columnar_rows, args.seed)
+    for name, millis in columnar.items():
+        print(f"  {name:<32} {millis:>10.1f} ms  "
+              f"({millis / columnar['float32_matrix_copy']:>5.1f}x the matrix copy)")
+
+    with open(args.output, 'w') as f:
+        json.dump({'single_record_us': single, 'batches_us': batches, 'columnar_ms': columnar,
+                   'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}, f, indent=2)
+    print(f"\n✓ Results written to '{args.output}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+Inference benchmark for RuleNetClassifier.
+Measures single-row predict_proba latency percentiles and batch throughput
+across batch sizes, reports how many rows the rules short-circuit versus
+defer to the forest, and writes the results as JSON so runs against
+different model artifacts can be compared.
+
+Usage: python benchmark_inference.py
+       python benchmark_inference.py --model best_rf_model.pkl --engine flat --output bench.json
+"""
+
+import argparse
+import json
+import os
+import pickle
+import platform
+import time
+
+import numpy as np
+
+from flat_forest import FlatForest
+from model_artifact import load_artifact
+from model_io import file_sha256
+from rulenet import RuleNetClassifier
+from synthetic_data import generate
+
+DEFAULT_BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+
+def build_model(rf_model, engine):
+    if engine == 'flat':
+        return RuleNetClassifier(FlatForest.from_sklearn(rf_model))
+    return RuleNetClassifier(rf_model)
+
+
+def bench_single_row(model, X, iterations):
+    """Per-call latency in milliseconds for one-row predict_proba calls."""
+    model.predict_proba(X[:1])  # warm up
+    latencies = np.empty(iterations)
+    for i in range(iterations):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        latencies[i] = time.perf_counter() - start
+    latencies *= 1e3
+    return {
+        'iterations': iterations,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'mean_ms': float(latencies.mean()),
+    }
+
+
+def bench_batch(model, X, batch_size, min_rows=200_000, max_repeats=20):
+    """Median rows/sec over repeated predict_proba calls on batch_size rows."""
+    batch = X[:batch_size]
+    repeats = int(min(max_repeats, max(3, min_rows // batch_size)))
+    model.predict_proba(batch)  # warm up
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        seconds.append(time.perf_counter() - start)
+    median = float(np.median(seconds))
+    return {
+        'batch_size': len(batch),
+        'repeats': repeats,
+        'median_seconds': median,
+        'rows_per_sec': len(batch) / median,
+    }
+
+
+def rule_breakdown(model, X):
+    """Rule short-circuit vs forest-deferred rows, and time spent in each path."""
+    start = time.perf_counter()
+    rule_preds = model.apply_rules(X)
+    rules_seconds = time.perf_counter() - start
+
+    deferred = rule_preds == -1
+    start = time.perf_counter()
+    if deferred.any():
+        model.rf_model.predict_proba(X[deferred])
+    forest_seconds = time.perf_counter() - start
+
+    return {
+        'rows': len(X),
+        'short_circuit_rows': int((~deferred).sum()),
+        'deferred_rows': int(deferred.sum()),
+        'short_circuit_rate': float((~deferred).mean()),
+        'deferred_rate': float(deferred.mean()),
+        'rules_seconds': rules_seconds,
+        'forest_seconds': forest_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RuleNet inference")
+    parser.add_argument('--model', default='best_rf_model.pkl',
+                        help="Pickled Random Forest or .rnf artifact")
+    parser.add_argument('--engine', choices=['sklearn', 'flat'], default='sklearn',
+                        help="Forest evaluator behind RuleNet")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES)
+    parser.add_argument('--single-row-iterations', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=7, help="Seed for the benchmark rows")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON results file")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  RULENET INFERENCE BENCHMARK")
+    print("=" * 70)
+
+    if args.model.endswith('.rnf'):
+        # Artifacts only carry the flat forest
+        args.engine = 'flat'
+        model = RuleNetClassifier(load_artifact(args.model)[0])
+    else:
+        with open(args.model, 'rb') as f:
+            rf_model = pickle.load(f)
+        model = build_model(rf_model, args.engine)
+
+    X, _ = generate(max(args.batch_sizes), seed=args.seed)
+    print(f"\nModel: {args.model} ({args.engine} engine), {len(X):,} benchmark rows")
+
+    results = {
+        'model': {
+            'path': args.model,
+            'sha256': file_sha256(args.model),
+            'mtime': os.path.getmtime(args.model),
+            'engine': args.engine,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+        },
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+    print("\n[1/3] Single-row latency...")
+    results['single_row'] = bench_single_row(model, X, args.single_row_iterations)
+    single = results['single_row']
+    print(f"  p50 {single['p50_ms']:.3f} ms | p95 {single['p95_ms']:.3f} ms | "
+          f"p99 {single['p99_ms']:.3f} ms")
+
+    print("\n[2/3] Batch throughput...")
+    results['batch'] = []
+    for batch_size in args.batch_sizes:
+        entry = bench_batch(model, X, batch_size)
+        results['batch'].append(entry)
+        print(f"  batch {entry['batch_size']:>9,}: {entry['rows_per_sec']:>12,.0f} rows/sec")
+
+    print("\n[3/3] Rule short-circuit vs forest deferral...")
+    results['rules'] = rule_breakdown(model, X)
+    rules = results['rules']
+    print(f"  short-circuited by rules: {rules['short_circuit_rows']:,} "
+          f"({rules['short_circuit_rate']:.1%}) in {rules['rules_seconds']:.3f}s")
+    print(f"  deferred to forest:       {rules['deferred_rows']:,} "
+          f"({rules['deferred_rate']:.1%}) in {rules['forest_seconds']:.3f}s")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results written to '{args.output}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Parallel inference benchmark: RuleNet over a ParallelForest process pool at
+increasing worker counts against the same model scored serially, on one
+thread (a pickled forest's n_jobs is reset to 1 in both cases).
+For each worker count the pool is started and warmed up first, then the
+median of repeated predict_proba calls on the full batch is reported as
+rows/sec, speedup over serial and parallel efficiency (speedup / workers).
+Every run is checked to return exactly the serial probabilities.
+
+Speedup is bounded by the physical cores: worker counts above os.cpu_count()
+are still measured, but are flagged as oversubscribed in the output.
+
+Usage: python benchmark_parallel.py
+       python benchmark_parallel.py --model best_rf_model.pkl --rows 5000000 --workers 1 4 16
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+
+import numpy as np
+
+from model_io import file_sha256
+from parallel_forest import ParallelForest, load_forest
+from rulenet import RuleNetClassifier
+from synthetic_data import generate
+
+DEFAULT_WORKERS = [1, 2, 4, 8, 16]
+
+
+def time_predict_proba(model, X, repeats):
+    """(median seconds, probabilities) over repeated full-batch predict_proba calls."""
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        probas = model.predict_proba(X)
+        seconds.append(time.perf_counter() - start)
+    return float(np.median(seconds)), probas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark process-pool RuleNet inference")
+    parser.add_argument('--model', default='best_rf_model.rnf',
+                        help=".rnf artifact or pickled Random Forest")
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=DEFAULT_WORKERS)
+    parser.add_argument('--chunk-size', type=int, help="Rows per task (default: ~4 per worker)")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7, help="Seed for the benchmark rows")
+    parser.add_argument('--output', default='benchmark_parallel.json', help="JSON results file")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  RULENET PARALLEL INFERENCE BENCHMARK")
+    print("=" * 70)
+
+    X, _ = generate(args.rows, seed=args.seed)
+    cpu_count = os.cpu_count()
+    print(f"\nModel: {args.model}, {len(X):,} rows, {cpu_count} CPU(s)")
+
+    serial = RuleNetClassifier(load_forest(args.model))
+    serial_seconds, expected = time_predict_proba(serial, X, args.repeats)
+    stats = serial.rule_stats()
+    print(f"Rules short-circuit {1 - stats['deferral_rate']:.1%} of rows; "
+          f"the forest scores the other {stats['deferral_rate']:.1%}")
+    print(f"\n{'workers':>7} {'seconds':>9} {'rows/sec':>12} {'speedup':>8} {'efficiency':>10}")
+    print(f"{'serial':>7} {serial_seconds:>9.3f} {len(X) / serial_seconds:>12,.0f}")
+
+    points = []
+    for workers in args.workers:
+        # min_parallel_rows=0: even one worker goes through the pool, so its
+        # row is the cost of the pool itself
+        with ParallelForest(args.model, workers, args.chunk_size, min_parallel_rows=0) as forest:
+            forest.warm_up()
+            model = RuleNetClassifier(forest)
+            seconds, probas = time_predict_proba(model, X, args.repeats)
+        if not np.array_equal(probas, expected):
+            raise RuntimeError(f"{workers} workers returned different probabilities")
+        point = {
+            'workers': workers,
+            'seconds': seconds,
+            'rows_per_sec': len(X) / seconds,
+            'speedup': serial_seconds / seconds,
+            'efficiency': serial_seconds / seconds / workers,
+            'oversubscribed': workers > cpu_count,
+        }
+        points.append(point)
+        note = "  (more workers than CPUs)" if point['oversubscribed'] else ""
+        print(f"{workers:>7} {seconds:>9.3f} {point['rows_per_sec']:>12,.0f} "
+              f"{point['speedup']:>7.2f}x {point['efficiency']:>10.0%}{note}")
+
+    results = {
+        'model': {'path': args.model, 'sha256': file_sha256(args.model)},
+        'rows': len(X),
+        'deferral_rate': stats['deferral_rate'],
+        'serial': {'seconds': serial_seconds, 'rows_per_sec': len(X) / serial_seconds},
+        'parallel': points,
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpu_count': cpu_count,
+        },
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results written to '{args.output}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Chunked reading and writing of CSV / Parquet files, shared by the bulk
+scorer and the synthetic data generator. Parquet stays in pyarrow record
+batches; pyarrow is only imported for Parquet files.
+
+Usage: from chunk_io import ChunkWriter, iter_chunks
+"""
+
+import pandas as pd
+
+
+def iter_chunks(path, chunk_size):
+    """Yield chunks of at most chunk_size rows: DataFrames from a CSV file,
+    pyarrow RecordBatches from a Parquet file."""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        yield from parquet_file.iter_batches(batch_size=chunk_size)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ChunkWriter:
+    """Appends chunks to a CSV or Parquet output file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.is_parquet = path.endswith('.parquet')
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, chunk):
+        """Append a DataFrame or a pyarrow RecordBatch."""
+        if self.is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if isinstance(chunk, pd.DataFrame):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+            else:
+                table = pa.Table.from_batches([chunk])
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            df = chunk if isinstance(chunk, pd.DataFrame) else chunk.to_pandas()
+            df.to_csv(self.path, mode='a' if self._wrote_header else 'w',
+                      header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
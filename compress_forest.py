@@ -0,0 +1,235 @@
+"""
+Post-training compression of the RuleNet forest.
+Starting from the trained 100-tree, depth-20 forest, this can:
+  - keep only the trees that best reproduce the full forest's probabilities
+    (greedy forward selection on a holdout set),
+  - cap tree depth, turning nodes at the cut into leaves with their
+    training class distribution,
+  - quantize thresholds to float16 and leaf probabilities to uint8,
+  - merge sibling leaves whose (quantized) probabilities are identical.
+
+Each operating point is reported as RuleNet accuracy delta against the full
+forest, stored size, and single-row / batch latency, so a deployment point
+can be chosen. The chosen point is written as a .rnf artifact.
+
+Usage: python compress_forest.py --sweep
+       python compress_forest.py --trees 30 --max-depth 12 --quantize --output compressed.rnf
+"""
+
+import argparse
+import json
+import pickle
+import time
+
+import numpy as np
+
+from feature_schema import FEATURE_COLUMNS
+from flat_forest import FlatForest
+from model_artifact import (
+    ARRAY_DTYPES, QUANTIZED_DTYPES, dequantize_values, quantize_values, save_artifact,
+)
+from model_io import load_holdout
+from rulenet import RuleNetClassifier
+
+
+def compact(forest, roots, max_depth=None):
+    """Rebuild the forest from the given roots, keeping only reachable nodes.
+
+    Nodes are renumbered level by level across all trees; with max_depth set,
+    nodes at that depth become leaves.
+    """
+    leaf = forest.left == np.arange(len(forest.left))
+    order, depth_of = [], []
+    frontier = np.asarray(roots)
+    depth = 0
+    while len(frontier):
+        order.append(frontier)
+        depth_of.append(np.full(len(frontier), depth))
+        if max_depth is not None and depth >= max_depth:
+            break
+        internal = frontier[~leaf[frontier]]
+        frontier = np.concatenate([forest.left[internal], forest.right[internal]])
+        depth += 1
+
+    old_ids = np.concatenate(order)
+    node_depth = np.concatenate(depth_of)
+    new_ids = np.full(len(forest.left), -1)
+    new_ids[old_ids] = np.arange(len(old_ids))
+
+    is_leaf = leaf[old_ids]
+    if max_depth is not None:
+        is_leaf |= node_depth >= max_depth
+    self_ids = np.arange(len(old_ids))
+    left = np.where(is_leaf, self_ids, new_ids[forest.left[old_ids]])
+    right = np.where(is_leaf, self_ids, new_ids[forest.right[old_ids]])
+    feature = np.where(is_leaf, 0, forest.feature[old_ids])
+
+    return FlatForest(
+        feature, forest.threshold[old_ids], left, right, forest.value[old_ids],
+        np.arange(len(roots)), int(node_depth.max()), forest.classes_
+    )
+
+
+def select_trees(forest, X, n_trees):
+    """Greedily pick the n_trees whose average best matches the full forest on X."""
+    leaves = forest.apply(X)                          # (n_samples, n_trees)
+    per_tree = forest.value[leaves][:, :, 1].T        # (n_trees, n_samples)
+    target = per_tree.mean(axis=0)
+
+    chosen = []
+    remaining = list(range(forest.n_estimators))
+    running = np.zeros(len(X))
+    for k in range(1, n_trees + 1):
+        candidates = (running + per_tree[remaining]) / k
+        errors = ((candidates - target) ** 2).mean(axis=1)
+        best = remaining.pop(int(np.argmin(errors)))
+        chosen.append(best)
+        running += per_tree[best]
+    return compact(forest, forest.roots[np.sort(chosen)])
+
+
+def quantize(forest):
+    """float16 thresholds and uint8 leaf probabilities, dequantized for evaluation."""
+    return FlatForest(
+        forest.feature, forest.threshold.astype(np.float16).astype(np.float64),
+        forest.left, forest.right, dequantize_values(quantize_values(forest.value)),
+        forest.roots, forest.max_depth, forest.classes_
+    )
+
+
+def merge_identical_leaves(forest):
+    """Collapse internal nodes whose two children are leaves with equal values."""
+    left, right = forest.left.copy(), forest.right.copy()
+    value = forest.value.copy()
+    node_ids = np.arange(len(left))
+    while True:
+        leaf = left == node_ids
+        mergeable = (~leaf & leaf[left] & leaf[right]
+                     & np.all(value[left] == value[right], axis=1))
+        if not mergeable.any():
+            break
+        nodes = node_ids[mergeable]
+        value[nodes] = value[left[nodes]]
+        left[nodes] = nodes
+        right[nodes] = nodes
+    merged = FlatForest(forest.feature, forest.threshold, left, right, value,
+                        forest.roots, forest.max_depth, forest.classes_)
+    return compact(merged, merged.roots)
+
+
+def compress(forest, X_select, n_trees=None, max_depth=None, quantized=False):
+    if n_trees is not None and n_trees < forest.n_estimators:
+        forest = select_trees(forest, X_select, n_trees)
+    if max_depth is not None and max_depth < forest.max_depth:
+        forest = compact(forest, forest.roots, max_depth=max_depth)
+    if quantized:
+        forest = quantize(forest)
+    return merge_identical_leaves(forest)
+
+
+def storage_bytes(forest, quantized):
+    dtypes = QUANTIZED_DTYPES if quantized else ARRAY_DTYPES
+    return sum(np.dtype(dtype).itemsize * getattr(forest, name).size
+               for name, dtype in dtypes.items())
+
+
+def evaluate(forest, X, y, quantized, single_row_iterations=300):
+    """Accuracy and batch throughput of RuleNet on (X, y); single-row latency
+    on rows the rules defer, so it measures the forest, not the rules."""
+    model = RuleNetClassifier(forest)
+    probas = model.predict_proba(X)
+    accuracy = float(((probas[:, 1] > 0.5).astype(int) == y).mean())
+
+    X_deferred = X[model.match_rules(X) == -1]
+    if not len(X_deferred):
+        X_deferred = X
+    model.predict_proba(X_deferred[:1])
+    start = time.perf_counter()
+    for i in range(single_row_iterations):
+        row = i % len(X_deferred)
+        model.predict_proba(X_deferred[row:row + 1])
+    single_ms = (time.perf_counter() - start) / single_row_iterations * 1e3
+
+    start = time.perf_counter()
+    model.predict_proba(X)
+    batch_rows_per_sec = len(X) / (time.perf_counter() - start)
+
+    return {
+        'trees': forest.n_estimators,
+        'max_depth': forest.max_depth,
+        'nodes': len(forest.feature),
+        'quantized': quantized,
+        'size_kb': storage_bytes(forest, quantized) / 1024,
+        'accuracy': accuracy,
+        'single_row_ms': single_ms,
+        'batch_rows_per_sec': batch_rows_per_sec,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress the RuleNet forest")
+    parser.add_argument('--model', default='best_rf_model.pkl', help="Pickled Random Forest")
+    parser.add_argument('--holdout', help="Labelled CSV/Parquet (synthetic holdout when omitted)")
+    parser.add_argument('--holdout-rows', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=2024, help="Seed for the synthetic holdout")
+    parser.add_argument('--sweep', action='store_true', help="Report a grid of operating points")
+    parser.add_argument('--trees', type=int, help="Trees to keep")
+    parser.add_argument('--max-depth', type=int, help="Maximum tree depth")
+    parser.add_argument('--quantize', action='store_true', help="float16 thresholds, uint8 leaves")
+    parser.add_argument('--output', default='best_rf_model_compressed.rnf')
+    parser.add_argument('--report', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  FOREST COMPRESSION")
+    print("=" * 70)
+
+    with open(args.model, 'rb') as f:
+        rf_model = pickle.load(f)
+    full = FlatForest.from_sklearn(rf_model)
+    X, y = load_holdout(args.holdout, args.holdout_rows, args.seed)
+
+    # Select trees on one half of the holdout, measure on the other. In RuleNet
+    # the forest only scores rows the rules defer, so trees are picked to
+    # match the full forest on those
+    half = len(X) // 2
+    X_select, (X_eval, y_eval) = X[:half], (X[half:], y[half:])
+    X_select = X_select[RuleNetClassifier(full).match_rules(X_select) == -1]
+
+    baseline = evaluate(full, X_eval, y_eval, quantized=False)
+    if args.sweep:
+        points = [(t, d, q) for t in (100, 50, 30, 15) for d in (20, 12, 8) for q in (False, True)]
+    else:
+        points = [(args.trees, args.max_depth, args.quantize)]
+
+    results = []
+    print(f"\n{'trees':>5} {'depth':>5} {'quant':>5} {'nodes':>9} {'size KB':>9} "
+          f"{'acc Δ':>8} {'1-row ms':>9} {'rows/sec':>10}")
+    for n_trees, max_depth, quantized in points:
+        forest = compress(full, X_select, n_trees, max_depth, quantized)
+        result = evaluate(forest, X_eval, y_eval, quantized)
+        result['accuracy_delta'] = result['accuracy'] - baseline['accuracy']
+        result['size_ratio'] = result['size_kb'] / baseline['size_kb']
+        result['single_row_speedup'] = baseline['single_row_ms'] / result['single_row_ms']
+        results.append(result)
+        print(f"{result['trees']:>5} {result['max_depth']:>5} {str(quantized):>5} "
+              f"{result['nodes']:>9,} {result['size_kb']:>9.1f} "
+              f"{result['accuracy_delta'] * 100:>+7.2f}% {result['single_row_ms']:>9.3f} "
+              f"{result['batch_rows_per_sec']:>10,.0f}")
+
+    print(f"\nBaseline: {baseline['trees']} trees, {baseline['size_kb']:.1f} KB, "
+          f"accuracy {baseline['accuracy'] * 100:.2f}%, {baseline['single_row_ms']:.3f} ms/row")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'baseline': baseline, 'points': results}, f, indent=2)
+        print(f"✓ Report written to '{args.report}'")
+
+    if not args.sweep:
+        save_artifact(args.output, forest, FEATURE_COLUMNS, quantized=args.quantize,
+                      metadata={'source': args.model, 'compression': results[0]})
+        print(f"✓ Compressed forest written to '{args.output}'")
+
+
+if __name__ == '__main__':
+    main()
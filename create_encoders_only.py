@@ -6,7 +6,8 @@ Usage: python create_encoders_only.py
 """
 
 import pickle
-from sklearn.preprocessing import LabelEncoder
+
+from feature_schema import build_label_encoders
 
 print("=" * 70)
 print("  LABEL ENCODERS GENERATOR")
@@ -15,108 +16,15 @@ print("=" * 70)
 print("\n📝 Creating Label Encoders...")
 print("-" * 70)
 
-# Dictionary to store all encoders
-label_encoders = {}
-
-# ============================================================================
-# 1. SEX ENCODER
-# ============================================================================
-print("\n[1/5] Creating Sex Encoder...")
-sex_encoder = LabelEncoder()
-sex_categories = ['Female', 'Male']
-sex_encoder.fit(sex_categories)
-label_encoders['Sex'] = sex_encoder
-
-print(f"  ✓ Sex Encoder created")
-print(f"     Categories: {sex_categories}")
-print(f"     Encoding: Female=0, Male=1")
-
-# ============================================================================
-# 2. AGE CATEGORY ENCODER
-# ============================================================================
-print("\n[2/5] Creating Age Category Encoder...")
-age_encoder = LabelEncoder()
-age_categories = [
-    '18-24',    # 0
-    '25-29',    # 1
-    '30-34',    # 2
-    '35-39',    # 3
-    '40-44',    # 4
-    '45-49',    # 5
-    '50-54',    # 6
-    '55-59',    # 7
-    '60-64',    # 8
-    '65-69',    # 9
-    '70-74',    # 10
-    '75-79',    # 11
-    '80 or older'  # 12
-]
-age_encoder.fit(age_categories)
-label_encoders['AgeCategory'] = age_encoder
-
-print(f"  ✓ Age Category Encoder created")
-print(f"     Total categories: {len(age_categories)}")
-print(f"     Range: 18-24 (0) to 80+ (12)")
-
-# ============================================================================
-# 3. RACE ENCODER
-# ============================================================================
-print("\n[3/5] Creating Race Encoder...")
-race_encoder = LabelEncoder()
-race_categories = [
-    'American Indian/Alaskan Native',  # 0
-    'Asian',                           # 1
-    'Black',                           # 2
-    'Hispanic',                        # 3
-    'Other',                           # 4
-    'White'                            # 5
-]
-race_encoder.fit(race_categories)
-label_encoders['Race'] = race_encoder
-
-print(f"  ✓ Race Encoder created")
-print(f"     Categories: {len(race_categories)}")
-for i, cat in enumerate(race_categories):
-    print(f"       {i}: {cat}")
-
-# ============================================================================
-# 4. DIABETIC STATUS ENCODER
-# ============================================================================
-print("\n[4/5] Creating Diabetic Status Encoder...")
-diabetic_encoder = LabelEncoder()
-diabetic_categories = [
-    'No',                        # 0
-    'No, borderline diabetes',   # 1
-    'Yes',                       # 2
-    'Yes (during pregnancy)'     # 3
-]
-diabetic_encoder.fit(diabetic_categories)
-label_encoders['Diabetic'] = diabetic_encoder
-
-print(f"  ✓ Diabetic Status Encoder created")
-print(f"     Categories:")
-for i, cat in enumerate(diabetic_categories):
-    print(f"       {i}: {cat}")
+# Classes in feature_schema code order. LabelEncoder.fit would sort them
+# alphabetically (e.g. Race 'White' -> 5), which is not how the model's
+# inputs are encoded.
+label_encoders = build_label_encoders()
 
-# ============================================================================
-# 5. GENERAL HEALTH ENCODER
-# ============================================================================
-print("\n[5/5] Creating General Health Encoder...")
-health_encoder = LabelEncoder()
-health_categories = [
-    'Excellent',    # 0
-    'Fair',         # 1
-    'Good',         # 2
-    'Poor',         # 3
-    'Very good'     # 4
-]
-health_encoder.fit(health_categories)
-label_encoders['GenHealth'] = health_encoder
-
-print(f"  ✓ General Health Encoder created")
-print(f"     Categories:")
-for i, cat in enumerate(health_categories):
-    print(f"       {i}: {cat}")
+for i, (name, encoder) in enumerate(label_encoders.items(), 1):
+    print(f"\n[{i}/{len(label_encoders)}] {name} Encoder")
+    for code, category in enumerate(encoder.classes_):
+        print(f"       {code}: {category}")
 
 # ============================================================================
 # SAVE ENCODERS TO PKL FILE
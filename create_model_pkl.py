@@ -1,16 +1,34 @@
 """
-Complete script to generate best_rf_model.pkl and label_encoders.pkl
-Run this to create all required pickle files for the Heart Disease Prediction app.
+Complete script to generate best_rf_model.pkl, label_encoders.pkl and best_rf_model.rnf
+Run this to create all required model files for the Heart Disease Prediction app.
 
 Usage: python create_model_pkl.py
+       python create_model_pkl.py --data heart_2020_cleaned.csv
 """
 
+import argparse
 import pickle
+import time
 import numpy as np
+import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
 import os
 
+from feature_schema import FEATURE_COLUMNS, build_label_encoders, encode_frame
+from synthetic_data import LABEL_COLUMN, generate
+from flat_forest import FlatForest
+from model_artifact import save_artifact
+
+parser = argparse.ArgumentParser(description="Train the Random Forest behind RuleNet")
+parser.add_argument('--data', help="CDC BRFSS 2020 CSV/Parquet with a HeartDisease column "
+                                   "(synthetic data is generated when omitted)")
+parser.add_argument('--samples', type=int, default=15000, help="Synthetic sample count")
+args = parser.parse_args()
+
+# Wall-clock seconds per stage, reported at the end
+timings = {}
+stage_start = time.perf_counter()
+
 print("=" * 70)
 print("  HEART DISEASE PREDICTION - MODEL & ENCODER GENERATOR")
 print("=" * 70)
@@ -39,89 +57,51 @@ print(f"  - Trees: {rf_model.n_estimators}")
 print(f"  - Max Depth: {rf_model.max_depth}")
 print(f"  - Random State: {rf_model.random_state}")
 
+timings['Model setup'] = time.perf_counter() - stage_start
+
 # ============================================================================
-# PART 2: GENERATE TRAINING DATA
+# PART 2: LOAD OR GENERATE TRAINING DATA
 # ============================================================================
 
-print("\n[STEP 2/4] Generating Training Data...")
-print("-" * 70)
+stage_start = time.perf_counter()
+
+if args.data:
+    print(f"\n[STEP 2/4] Loading Training Data from '{args.data}'...")
+    print("-" * 70)
+
+    # Only the 17 features and the label are read; string columns are kept
+    # as categoricals so the raw file never sits in memory as Python objects
+    columns = FEATURE_COLUMNS + [LABEL_COLUMN]
+    if args.data.endswith('.parquet'):
+        data = pd.read_parquet(args.data, columns=columns)
+    else:
+        sample = pd.read_csv(args.data, usecols=columns, nrows=1000)
+        data = pd.read_csv(args.data, usecols=columns, dtype={
+            col: 'category' for col in columns if sample[col].dtype == object
+        })
+    n_samples = len(data)
+
+    X_train = encode_frame(data).astype(np.float32)
+    labels = data[LABEL_COLUMN]
+    if pd.api.types.is_numeric_dtype(labels):
+        y_train = labels.to_numpy(dtype=int)  # pre-encoded, e.g. synthetic_data.py output
+    else:
+        y_train = (labels == 'Yes').to_numpy(dtype=int)
+    del data
 
-np.random.seed(42)
-n_samples = 15000  # Larger dataset for better training
-
-print(f"Generating {n_samples} samples with 17 features...")
-
-# Generate feature data
-X_train = np.column_stack([
-    np.random.uniform(15, 50, n_samples),      # 0: BMI (15-50)
-    np.random.randint(0, 2, n_samples),        # 1: Smoking (0=No, 1=Yes)
-    np.random.randint(0, 2, n_samples),        # 2: AlcoholDrinking (0=No, 1=Yes)
-    np.random.randint(0, 2, n_samples),        # 3: Stroke (0=No, 1=Yes)
-    np.random.randint(0, 31, n_samples),       # 4: PhysicalHealth (0-30 days)
-    np.random.randint(0, 31, n_samples),       # 5: MentalHealth (0-30 days)
-    np.random.randint(0, 2, n_samples),        # 6: DiffWalking (0=No, 1=Yes)
-    np.random.randint(0, 2, n_samples),        # 7: Sex (0=Female, 1=Male)
-    np.random.randint(0, 13, n_samples),       # 8: AgeCategory (0-12)
-    np.random.randint(0, 6, n_samples),        # 9: Race (0-5)
-    np.random.randint(0, 4, n_samples),        # 10: Diabetic (0-3)
-    np.random.randint(0, 2, n_samples),        # 11: PhysicalActivity (0=No, 1=Yes)
-    np.random.randint(0, 5, n_samples),        # 12: GenHealth (0-4)
-    np.random.randint(4, 12, n_samples),       # 13: SleepTime (4-11 hours)
-    np.random.randint(0, 2, n_samples),        # 14: Asthma (0=No, 1=Yes)
-    np.random.randint(0, 2, n_samples),        # 15: KidneyDisease (0=No, 1=Yes)
-    np.random.randint(0, 2, n_samples),        # 16: SkinCancer (0=No, 1=Yes)
-])
-
-print("✓ Feature matrix created: shape", X_train.shape)
-
-# Generate target variable with realistic risk modeling
-print("\nGenerating target labels with risk modeling...")
-y_train = np.zeros(n_samples, dtype=int)
-
-for i in range(n_samples):
-    risk_score = 0.0
-    
-    # Major risk factors
-    if X_train[i, 0] > 35: risk_score += 0.30      # Obesity (BMI > 35)
-    if X_train[i, 0] > 30: risk_score += 0.15      # Overweight (BMI > 30)
-    if X_train[i, 1] == 1: risk_score += 0.35      # Smoking
-    if X_train[i, 3] == 1: risk_score += 0.40      # Previous Stroke
-    if X_train[i, 4] > 20: risk_score += 0.25      # Very poor physical health
-    if X_train[i, 4] > 15: risk_score += 0.15      # Poor physical health
-    
-    # Age risk (exponential with age)
-    if X_train[i, 8] >= 10: risk_score += 0.35     # Age 70+
-    elif X_train[i, 8] >= 8: risk_score += 0.25    # Age 60-69
-    elif X_train[i, 8] >= 6: risk_score += 0.15    # Age 50-59
-    
-    # Chronic conditions
-    if X_train[i, 10] >= 2: risk_score += 0.30     # Diabetic
-    elif X_train[i, 10] == 1: risk_score += 0.15   # Borderline diabetic
-    if X_train[i, 6] == 1: risk_score += 0.20      # Difficulty walking
-    if X_train[i, 15] == 1: risk_score += 0.25     # Kidney disease
-    
-    # Lifestyle factors
-    if X_train[i, 2] == 1: risk_score += 0.15      # Heavy alcohol
-    if X_train[i, 11] == 0: risk_score += 0.10     # No physical activity
-    
-    # General health
-    if X_train[i, 12] == 4: risk_score += 0.25     # Poor health
-    elif X_train[i, 12] == 3: risk_score += 0.15   # Fair health
-    
-    # Sleep
-    if X_train[i, 13] < 6 or X_train[i, 13] > 9:
-        risk_score += 0.10  # Poor sleep
-    
-    # Mental health correlation
-    if X_train[i, 5] > 20: risk_score += 0.15      # Poor mental health
-    
-    # Assign heart disease label
-    threshold = 0.7 + np.random.uniform(-0.2, 0.2)  # Variable threshold
-    y_train[i] = 1 if risk_score > threshold else 0
-
-# Add some random noise for realism (5% random flips)
-noise_indices = np.random.choice(n_samples, size=int(n_samples * 0.05), replace=False)
-y_train[noise_indices] = 1 - y_train[noise_indices]
+    print("✓ Feature matrix encoded: shape", X_train.shape)
+else:
+    print("\n[STEP 2/4] Generating Training Data...")
+    print("-" * 70)
+
+    n_samples = args.samples
+
+    print(f"Generating {n_samples} samples with 17 features...")
+    X_train, y_train = generate(n_samples, seed=42)
+
+    print("✓ Feature matrix and risk-model labels created: shape", X_train.shape)
+
+timings['Data preparation'] = time.perf_counter() - stage_start
 
 # Statistics
 positive_cases = int(y_train.sum())
@@ -140,12 +120,16 @@ print("\n[STEP 3/4] Training Random Forest Model...")
 print("-" * 70)
 
 print("Training in progress... (this may take a moment)")
+stage_start = time.perf_counter()
 rf_model.fit(X_train, y_train)
+timings['Training'] = time.perf_counter() - stage_start
 
-# Calculate training metrics
-train_accuracy = rf_model.score(X_train, y_train)
-train_predictions = rf_model.predict(X_train)
+# Calculate training metrics (one pass over the forest, predictions derived from it)
+stage_start = time.perf_counter()
 train_probabilities = rf_model.predict_proba(X_train)
+train_predictions = rf_model.classes_[train_probabilities.argmax(axis=1)]
+train_accuracy = float((train_predictions == y_train).mean())
+timings['Training metrics'] = time.perf_counter() - stage_start
 
 print(f"\n✓ Model training completed!")
 print(f"  - Training Accuracy: {train_accuracy*100:.2f}%")
@@ -170,9 +154,11 @@ for feat, imp in top_features:
 # ============================================================================
 
 print("\n💾 Saving model to 'best_rf_model.pkl'...")
+stage_start = time.perf_counter()
 with open('best_rf_model.pkl', 'wb') as f:
     pickle.dump(rf_model, f)
 
+timings['Saving model'] = time.perf_counter() - stage_start
 file_size = os.path.getsize('best_rf_model.pkl') / 1024
 print(f"✓ Model saved successfully! (Size: {file_size:.2f} KB)")
 
@@ -183,44 +169,11 @@ print(f"✓ Model saved successfully! (Size: {file_size:.2f} KB)")
 print("\n[STEP 4/4] Creating Label Encoders...")
 print("-" * 70)
 
-label_encoders = {}
-
-# 1. Sex Encoder
-sex_encoder = LabelEncoder()
-sex_encoder.fit(['Female', 'Male'])
-label_encoders['Sex'] = sex_encoder
-print("✓ Sex encoder: ['Female', 'Male']")
-
-# 2. Age Category Encoder
-age_encoder = LabelEncoder()
-age_categories = [
-    '18-24', '25-29', '30-34', '35-39', '40-44', '45-49',
-    '50-54', '55-59', '60-64', '65-69', '70-74', '75-79', '80 or older'
-]
-age_encoder.fit(age_categories)
-label_encoders['AgeCategory'] = age_encoder
-print(f"✓ Age encoder: {len(age_categories)} categories")
-
-# 3. Race Encoder
-race_encoder = LabelEncoder()
-races = ['White', 'Black', 'Asian', 'American Indian/Alaskan Native', 'Hispanic', 'Other']
-race_encoder.fit(races)
-label_encoders['Race'] = race_encoder
-print(f"✓ Race encoder: {len(races)} categories")
-
-# 4. Diabetic Encoder
-diabetic_encoder = LabelEncoder()
-diabetic_categories = ['No', 'No, borderline diabetes', 'Yes', 'Yes (during pregnancy)']
-diabetic_encoder.fit(diabetic_categories)
-label_encoders['Diabetic'] = diabetic_encoder
-print(f"✓ Diabetic encoder: {len(diabetic_categories)} categories")
-
-# 5. General Health Encoder
-health_encoder = LabelEncoder()
-health_categories = ['Excellent', 'Very good', 'Good', 'Fair', 'Poor']
-health_encoder.fit(health_categories)
-label_encoders['GenHealth'] = health_encoder
-print(f"✓ General Health encoder: {len(health_categories)} categories")
+# Classes in feature_schema code order (LabelEncoder.fit would sort them
+# alphabetically, which is not how the model's inputs are encoded)
+label_encoders = build_label_encoders()
+for name, encoder in label_encoders.items():
+    print(f"✓ {name} encoder: {len(encoder.classes_)} categories")
 
 # Save encoders
 print("\n💾 Saving encoders to 'label_encoders.pkl'...")
@@ -230,6 +183,25 @@ with open('label_encoders.pkl', 'wb') as f:
 encoder_size = os.path.getsize('label_encoders.pkl') / 1024
 print(f"✓ Encoders saved successfully! (Size: {encoder_size:.2f} KB)")
 
+# Compact artifact: flat node arrays + JSON header, loadable without unpickling
+print("\n💾 Saving model artifact to 'best_rf_model.rnf'...")
+stage_start = time.perf_counter()
+save_artifact(
+    'best_rf_model.rnf', FlatForest.from_sklearn(rf_model), FEATURE_COLUMNS, label_encoders,
+    metadata={
+        'data': args.data or 'synthetic (seed 42)',
+        'training_samples': n_samples,
+        'positive_cases': positive_cases,
+        'train_accuracy': train_accuracy,
+        'feature_importances': dict(zip(FEATURE_COLUMNS, rf_model.feature_importances_.tolist())),
+        'params': rf_model.get_params(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+)
+timings['Saving artifact'] = time.perf_counter() - stage_start
+artifact_size = os.path.getsize('best_rf_model.rnf') / 1024
+print(f"✓ Artifact saved successfully! (Size: {artifact_size:.2f} KB)")
+
 # ============================================================================
 # VERIFICATION & SUMMARY
 # ============================================================================
@@ -241,6 +213,7 @@ print("=" * 70)
 print("\n📁 Generated Files:")
 print(f"  1. best_rf_model.pkl       → {file_size:.2f} KB")
 print(f"  2. label_encoders.pkl      → {encoder_size:.2f} KB")
+print(f"  3. best_rf_model.rnf       → {artifact_size:.2f} KB")
 
 print("\n📊 Model Summary:")
 print(f"  - Algorithm: Random Forest Classifier")
@@ -249,6 +222,11 @@ print(f"  - Features: 17")
 print(f"  - Accuracy: {train_accuracy*100:.2f}%")
 print(f"  - Positive Class: {positive_cases} ({positive_cases/n_samples*100:.1f}%)")
 
+print("\n⏱️ Stage Timings:")
+for stage, seconds in timings.items():
+    print(f"  - {stage:<18s} {seconds:8.2f}s")
+print(f"  - {'Total':<18s} {sum(timings.values()):8.2f}s")
+
 print("\n🚀 Next Steps:")
 print("  1. Ensure you have 'app.py' in the same directory")
 print("  2. Run: streamlit run app.py")
@@ -0,0 +1,168 @@
+"""
+Evaluation job for the deployed RuleNet model.
+Scores a labelled holdout file with the model artifact and computes accuracy,
+precision, recall, F1, AUC-ROC and the confusion matrix for RuleNet and for
+the Random Forest on its own, k-fold accuracy over stratified partitions of
+the holdout, and permutation feature importances (AUC drop when a feature is
+shuffled). The results are cached next to the artifact as
+<artifact>_eval.json, which the Streamlit app renders in tabs 2 and 3.
+
+The model is fixed, so "cross-validation" here is k-fold evaluation: the
+spread of accuracy across holdout partitions shows how stable the estimate is.
+
+Usage: python evaluate_model.py --holdout holdout.csv
+       python evaluate_model.py --model best_rf_model.rnf --folds 5
+"""
+
+import argparse
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+from sklearn.metrics import (
+    accuracy_score, confusion_matrix, f1_score, precision_score, recall_score, roc_auc_score,
+)
+from sklearn.model_selection import StratifiedKFold
+
+from feature_schema import FEATURE_COLUMNS
+from flat_forest import FlatForest
+from model_artifact import load_artifact
+from model_io import evaluation_path, file_sha256, load_holdout
+from rulenet import RuleNetClassifier, load_rules
+
+
+def load_forest(model_path):
+    """(forest, training feature importances or None) from a .rnf artifact or a pickle."""
+    if model_path.endswith('.rnf'):
+        forest, header = load_artifact(model_path)
+        return forest, header['metadata'].get('feature_importances')
+    with open(model_path, 'rb') as f:
+        rf_model = pickle.load(f)
+    importances = dict(zip(FEATURE_COLUMNS, rf_model.feature_importances_.tolist()))
+    return FlatForest.from_sklearn(rf_model), importances
+
+
+def classification_metrics(y, proba):
+    preds = (proba > 0.5).astype(int)
+    tn, fp, fn, tp = confusion_matrix(y, preds, labels=[0, 1]).ravel()
+    return {
+        'accuracy': float(accuracy_score(y, preds)),
+        'precision': float(precision_score(y, preds, zero_division=0)),
+        'recall': float(recall_score(y, preds, zero_division=0)),
+        'f1': float(f1_score(y, preds, zero_division=0)),
+        'auc': float(roc_auc_score(y, proba)),
+        'miss_rate': float(fn / (fn + tp)) if fn + tp else 0.0,
+        'confusion_matrix': {'tn': int(tn), 'fp': int(fp), 'fn': int(fn), 'tp': int(tp)},
+    }
+
+
+def fold_accuracies(y, proba, folds, seed):
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    preds = (proba > 0.5).astype(int)
+    return [float((preds[idx] == y[idx]).mean()) for _, idx in splitter.split(preds, y)]
+
+
+def permutation_importances(model, X, y, baseline_auc, seed):
+    """AUC lost when each feature column is shuffled, in FEATURE_COLUMNS order."""
+    rng = np.random.RandomState(seed)
+    X_perm = X.copy()
+    importances = {}
+    for j, name in enumerate(FEATURE_COLUMNS):
+        X_perm[:, j] = rng.permutation(X[:, j])
+        auc = roc_auc_score(y, model.predict_proba(X_perm)[:, 1])
+        importances[name] = float(baseline_auc - auc)
+        X_perm[:, j] = X[:, j]
+    return importances
+
+
+def evaluate(model_path, holdout_path=None, holdout_rows=20_000, folds=5, seed=2024,
+             rules_path=None):
+    forest, training_importances = load_forest(model_path)
+    model = RuleNetClassifier(forest, load_rules(rules_path) if rules_path else None)
+    X, y = load_holdout(holdout_path, holdout_rows, seed)
+
+    rulenet_proba = model.predict_proba(X)[:, 1]
+    forest_proba = forest.predict_proba(X)[:, 1]
+    rule_stats = model.rule_stats()
+
+    models = {}
+    for name, proba in (('RuleNet', rulenet_proba), ('Random Forest', forest_proba)):
+        metrics = classification_metrics(y, proba)
+        accuracies = fold_accuracies(y, proba, folds, seed)
+        metrics.update({
+            'fold_accuracies': accuracies,
+            'cv_accuracy_mean': float(np.mean(accuracies)),
+            'cv_accuracy_std': float(np.std(accuracies)),
+        })
+        models[name] = metrics
+
+    return {
+        'model': {
+            'path': model_path,
+            'sha256': file_sha256(model_path),
+            'mtime': os.path.getmtime(model_path),
+        },
+        'holdout': {
+            'path': holdout_path or f'synthetic (seed {seed})',
+            'rows': len(y),
+            'positive_rate': float(y.mean()),
+        },
+        'folds': folds,
+        'models': models,
+        'rules': {
+            'short_circuit_rate': 1 - rule_stats['deferral_rate'],
+            'hits': {rule['name']: rule['hits'] for rule in rule_stats['rules']},
+        },
+        'feature_importances': {
+            'permutation_auc_drop': permutation_importances(
+                model, X, y, models['RuleNet']['auc'], seed),
+            'training_impurity': training_importances,
+        },
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the RuleNet model on a holdout set")
+    parser.add_argument('--model', default='best_rf_model.rnf',
+                        help=".rnf artifact or pickled Random Forest")
+    parser.add_argument('--holdout', help="Labelled CSV/Parquet (synthetic holdout when omitted)")
+    parser.add_argument('--holdout-rows', type=int, default=20_000)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=2024,
+                        help="Seed for the synthetic holdout, folds and permutations")
+    parser.add_argument('--rules', help="JSON rule table (built-in rules when omitted)")
+    parser.add_argument('--output', help="Results file (default: <model>_eval.json)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  RULENET MODEL EVALUATION")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    results = evaluate(args.model, args.holdout, args.holdout_rows, args.folds, args.seed,
+                       args.rules)
+
+    print(f"\nHoldout: {results['holdout']['path']} ({results['holdout']['rows']:,} rows)")
+    print(f"\n{'model':<14} {'accuracy':>9} {'cv mean':>9} {'cv std':>8} "
+          f"{'precision':>10} {'recall':>8} {'f1':>8} {'auc':>7}")
+    for name, m in results['models'].items():
+        print(f"{name:<14} {m['accuracy']:>9.2%} {m['cv_accuracy_mean']:>9.2%} "
+              f"{m['cv_accuracy_std']:>8.2%} {m['precision']:>10.2%} {m['recall']:>8.2%} "
+              f"{m['f1']:>8.2%} {m['auc']:>7.3f}")
+
+    print("\nTop permutation importances (AUC drop):")
+    importances = results['feature_importances']['permutation_auc_drop']
+    for name, drop in sorted(importances.items(), key=lambda item: -item[1])[:8]:
+        print(f"  {name:<18} {drop:.4f}")
+
+    output = args.output or evaluation_path(args.model)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results written to '{output}' in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""
+Feature schema of the heart disease model: the 17 inputs in column order,
+their storage dtypes and the category codes. The app form, the trainer, the
+bulk scorer and the API all encode through this module.
+
+Category codes follow the order listed here, which is the order the model is
+trained on and the rules compare against (AgeCategory '18-24' -> 0 ...
+'80 or older' -> 12, GenHealth 'Excellent' -> 0 ... 'Poor' -> 4). sklearn's
+LabelEncoder sorts classes alphabetically ('White' -> 5, 'Very good' -> 4),
+so it is not used to encode model inputs; build_label_encoders() returns
+LabelEncoder objects whose classes follow this schema, for code that still
+reads label_encoders.pkl.
+
+Usage: from feature_schema import encode_frame, encode_columns, encode_record, RecordEncoder
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+FEATURE_COLUMNS = [
+    'BMI', 'Smoking', 'AlcoholDrinking', 'Stroke', 'PhysicalHealth',
+    'MentalHealth', 'DiffWalking', 'Sex', 'AgeCategory', 'Race',
+    'Diabetic', 'PhysicalActivity', 'GenHealth', 'SleepTime',
+    'Asthma', 'KidneyDisease', 'SkinCancer'
+]
+
+NUMERIC_COLUMNS = ['BMI', 'PhysicalHealth', 'MentalHealth', 'SleepTime']
+
+YES_NO_COLUMNS = [
+    'Smoking', 'AlcoholDrinking', 'Stroke', 'DiffWalking', 'PhysicalActivity',
+    'Asthma', 'KidneyDisease', 'SkinCancer'
+]
+
+CATEGORIES = {
+    'Sex': ['Female', 'Male'],
+    'AgeCategory': [
+        '18-24', '25-29', '30-34', '35-39', '40-44', '45-49', '50-54',
+        '55-59', '60-64', '65-69', '70-74', '75-79', '80 or older'
+    ],
+    'Race': ['White', 'Black', 'Asian', 'American Indian/Alaskan Native', 'Hispanic', 'Other'],
+    # Alphabetical, as the original LabelEncoder: synthetic_data scores 1 (borderline)
+    # below 2 and 3 (diabetic)
+    'Diabetic': ['No', 'No, borderline diabetes', 'Yes', 'Yes (during pregnancy)'],
+    'GenHealth': ['Excellent', 'Very good', 'Good', 'Fair', 'Poor'],
+}
+
+# Label -> code for every non-numeric feature
+CATEGORY_CODES = {name: {label: code for code, label in enumerate(labels)}
+                  for name, labels in CATEGORIES.items()}
+CATEGORY_CODES.update({name: {'No': 0, 'Yes': 1} for name in YES_NO_COLUMNS})
+
+# Storage dtypes for training data. encode_frame and the record encoders
+# return float64 matrices, encode_columns float32
+FEATURE_DTYPES = {name: np.float32 if name in NUMERIC_COLUMNS else np.int8
+                  for name in FEATURE_COLUMNS}
+
+# (column index, name, label -> code or None) for the single-row encoder
+_RECORD_PLAN = [(j, name, CATEGORY_CODES.get(name)) for j, name in enumerate(FEATURE_COLUMNS)]
+
+
+def encode_frame(df):
+    """Encode a BRFSS-shaped DataFrame into the (n, 17) float feature matrix.
+
+    Columns that are already numeric are taken as pre-encoded and passed
+    through, after checking that they are finite and, for categorical
+    features, valid codes. Blank cells are rejected, not scored.
+    """
+    missing = [c for c in FEATURE_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {missing}")
+
+    X = np.empty((len(df), len(FEATURE_COLUMNS)), dtype=np.float64)
+    for j, col in enumerate(FEATURE_COLUMNS):
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values):
+            numbers = values.to_numpy(dtype=np.float64)
+            _check_numbers(col, numbers)
+            X[:, j] = numbers
+            continue
+        if col in CATEGORY_CODES:
+            codes = values.map(CATEGORY_CODES[col])
+        else:
+            codes = pd.to_numeric(values, errors='coerce')
+        if codes.isna().any():
+            bad = values[codes.isna()].unique()[:5]
+            raise ValueError(f"Column '{col}' has unrecognised values: {list(bad)}")
+        numbers = codes.to_numpy(dtype=np.float64)
+        _check_numbers(col, numbers)
+        X[:, j] = numbers
+    return X
+
+
+def _unrecognised(name, labels):
+    return ValueError(f"Column '{name}' has unrecognised values: {list(labels)[:5]}")
+
+
+def _check_numbers(name, values):
+    """Reject missing or non-finite numbers and, for categorical features,
+    codes outside the schema (e.g. AgeCategory 99 or 2.5)."""
+    if values.dtype.kind == 'f':
+        finite = np.isfinite(values)
+        if not finite.all():
+            raise _unrecognised(name, values[~finite][:5].tolist())
+    codes = CATEGORY_CODES.get(name)
+    if codes is None or not len(values) or values.dtype.kind == 'b':
+        return
+    top = len(codes) - 1
+    fractional = values.dtype.kind == 'f' and bool((values % 1).any())
+    if values.min() < 0 or values.max() > top or fractional:
+        bad = (values < 0) | (values > top) | (values % 1 != 0)
+        raise _unrecognised(name, np.unique(values[bad]).tolist())
+
+
+def _arrow_column(name, array):
+    """Values of one Arrow column as a NumPy array: a view of the Arrow buffer
+    for numeric columns without nulls, category codes for labels."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if pa.types.is_integer(array.type) or pa.types.is_floating(array.type) \
+            or pa.types.is_boolean(array.type):
+        # Nulls become NaN here and are rejected by the check
+        values = array.to_numpy(zero_copy_only=False)
+        _check_numbers(name, values)
+        return values
+    if name not in CATEGORY_CODES:
+        try:
+            values = pc.cast(array, pa.float32()).to_numpy(zero_copy_only=False)
+        except pa.ArrowInvalid:
+            raise _unrecognised(name, pc.unique(array).to_pylist())
+        _check_numbers(name, values)
+        return values
+    labels = pa.array(list(CATEGORY_CODES[name]))
+    if pa.types.is_dictionary(array.type):
+        # Look up the (few) dictionary entries, then gather by index
+        codes = pc.take(pc.index_in(array.dictionary, value_set=labels), array.indices)
+    else:
+        codes = pc.index_in(array, value_set=labels)
+    if codes.null_count:
+        bad = pc.filter(array, pc.is_null(codes))
+        raise _unrecognised(name, pc.unique(bad).to_pylist())
+    return codes.to_numpy()
+
+
+def _numpy_column(name, values):
+    """One structured-array field as numbers: the field itself (a view) if numeric."""
+    if values.dtype.kind in 'biuf':
+        # Fields are strided views: read the field once into a contiguous
+        # copy, which the check and the output fill then scan cheaply
+        values = np.ascontiguousarray(values)
+        _check_numbers(name, values)
+        return values
+    if name not in CATEGORY_CODES:
+        try:
+            numbers = values.astype(np.float32)
+        except ValueError:
+            raise _unrecognised(name, [str(v) for v in np.unique(values)])
+        _check_numbers(name, numbers)
+        return numbers
+    codes = np.empty(len(values), dtype=np.int8)
+    matched = np.zeros(len(values), dtype=bool)
+    for label, code in CATEGORY_CODES[name].items():
+        mask = values == (label.encode() if values.dtype.kind == 'S' else label)
+        codes[mask] = code
+        matched |= mask
+    if not matched.all():
+        raise _unrecognised(name, [str(v) for v in np.unique(values[~matched])])
+    return codes
+
+
+def encode_columns(data):
+    """Encode columnar input into an (n, 17) float32 matrix.
+
+    data is a pyarrow RecordBatch or Table, or a NumPy structured array with
+    a field per feature. Labels are mapped to category codes and numbers are
+    used as they are. Numeric columns are read in place (Arrow buffers
+    without nulls and structured-array fields are views) and every value is
+    written once into the output, so nothing goes through pandas or an
+    object array. float32 is the dtype both forests compare in, so they use
+    the matrix without converting it.
+
+    Like DataFrame.values, the matrix is the transpose of a (17, n) array,
+    i.e. column-major: each feature is written as one contiguous run instead
+    of a strided column. The rules and forests index it by column and row,
+    so they do not need it C-contiguous.
+    """
+    if isinstance(data, np.ndarray):
+        names = data.dtype.names or ()
+    else:
+        names = data.schema.names
+    missing = [c for c in FEATURE_COLUMNS if c not in names]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {missing}")
+
+    if isinstance(data, np.ndarray):
+        parts = [[_numpy_column(name, data[name]) for name in FEATURE_COLUMNS]]
+    else:
+        # A Table is a run of record batches; each is encoded in place
+        batches = data.to_batches() if hasattr(data, 'to_batches') else [data]
+        parts = ([_arrow_column(name, batch.column(name)) for name in FEATURE_COLUMNS]
+                 for batch in batches)
+
+    X = np.empty((len(FEATURE_COLUMNS), len(data)), dtype=np.float32)
+    offset = 0
+    for columns in parts:
+        n_rows = len(columns[0])
+        for j, values in enumerate(columns):
+            X[j, offset:offset + n_rows] = values
+        offset += n_rows
+    return X.T
+
+
+def _fill_row(row, record):
+    for j, name, codes in _RECORD_PLAN:
+        try:
+            value = record[name]
+        except KeyError:
+            raise ValueError(f"Input is missing required columns: ['{name}']")
+        if codes is not None and isinstance(value, str):
+            try:
+                value = codes[value]
+            except KeyError:
+                raise ValueError(f"Column '{name}' has unrecognised values: [{value!r}]")
+        try:
+            row[j] = value
+        except (TypeError, ValueError):
+            raise ValueError(f"Column '{name}' has unrecognised values: [{value!r}]")
+        # None and blank numbers arrive as NaN; codes must be in the schema
+        number = row[j]
+        if not math.isfinite(number) if codes is None \
+                else not (0 <= number < len(codes) and number == int(number)):
+            raise ValueError(f"Column '{name}' has unrecognised values: [{value!r}]")
+
+
+def encode_record(record):
+    """Encode one patient (a mapping of feature name to label or number) as a (1, 17) matrix.
+
+    Plain dict lookups, no DataFrame: this is the interactive single-row path.
+    """
+    X = np.empty((1, len(FEATURE_COLUMNS)), dtype=np.float64)
+    _fill_row(X[0], record)
+    return X
+
+
+def encode_records(records):
+    """Encode a short list of records row by row; below a few hundred rows this
+    is cheaper than building a DataFrame for encode_frame."""
+    X = np.empty((len(records), len(FEATURE_COLUMNS)), dtype=np.float64)
+    for row, record in zip(X, records):
+        _fill_row(row, record)
+    return X
+
+
+class RecordEncoder:
+    """encode_record / encode_records into a preallocated buffer.
+
+    The returned matrix is a view of the buffer and is overwritten by the next
+    call: use one encoder per thread, and finish with the result (e.g. wait for
+    predict_proba) before encoding again. Batches larger than the buffer get a
+    fresh array.
+    """
+
+    def __init__(self, capacity=64):
+        self.buffer = np.empty((capacity, len(FEATURE_COLUMNS)), dtype=np.float64)
+
+    def encode(self, record):
+        _fill_row(self.buffer[0], record)
+        return self.buffer[:1]
+
+    def encode_many(self, records):
+        if len(records) > len(self.buffer):
+            return encode_records(records)
+        X = self.buffer[:len(records)]
+        for row, record in zip(X, records):
+            _fill_row(row, record)
+        return X
+
+
+def build_label_encoders():
+    """LabelEncoder per categorical feature, with classes_ in schema code order."""
+    from sklearn.preprocessing import LabelEncoder
+
+    encoders = {}
+    for name, labels in CATEGORIES.items():
+        encoder = LabelEncoder()
+        encoder.classes_ = np.array(labels, dtype=object)
+        encoders[name] = encoder
+    return encoders
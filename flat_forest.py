@@ -0,0 +1,138 @@
+"""
+Flat structure-of-arrays export of a trained RandomForestClassifier.
+Every tree's feature / threshold / children / value arrays are concatenated
+into one contiguous layout, and all trees are walked for a whole batch at once
+with NumPy. For finite inputs predict_proba is bit-identical to sklearn's.
+NaN would always go right here (NaN <= t is False), while sklearn 1.3
+rejects it and later versions route it by the node's missing_go_to_left, so
+non-finite inputs raise ValueError as sklearn 1.3 does. The feature_schema
+encoders already reject missing values.
+
+Usage: python flat_forest.py [best_rf_model.pkl] [best_rf_model_flat.npz]
+"""
+
+import pickle
+import sys
+
+import numpy as np
+
+# Rows evaluated per block; bounds the (rows x trees) working arrays
+BLOCK_SIZE = 8192
+
+
+class FlatForest:
+    """Drop-in replacement for a fitted forest's predict / predict_proba."""
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, classes):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        self.n_classes_ = len(self.classes_)
+        self.n_estimators = len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, rf_model):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in rf_model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes)
+            is_leaf = tree.children_left == -1
+
+            # Leaves point back at themselves, so every row can be stepped
+            # max_depth times without checking whether it already finished
+            feature = np.where(is_leaf, 0, tree.feature)
+            left = np.where(is_leaf, node_ids, tree.children_left + offset)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset)
+
+            # Same per-tree normalisation as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :rf_model.n_classes_].astype(np.float64)
+            normalizer = value.sum(axis=1)
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer[:, None]
+
+            features.append(feature)
+            thresholds.append(tree.threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        return cls(
+            np.concatenate(features), np.concatenate(thresholds),
+            np.concatenate(lefts), np.concatenate(rights),
+            np.concatenate(values), np.array(roots), max_depth, rf_model.classes_
+        )
+
+    def save(self, path):
+        np.savez(
+            path, feature=self.feature, threshold=self.threshold, left=self.left,
+            right=self.right, value=self.value, roots=self.roots,
+            max_depth=self.max_depth, classes=self.classes_
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                data['feature'], data['threshold'], data['left'], data['right'],
+                data['value'], data['roots'], int(data['max_depth']), data['classes']
+            )
+
+    def apply(self, X):
+        """Return the leaf node index reached in every tree, shape (n_samples, n_trees)."""
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if not np.isfinite(X).all():
+            raise ValueError("Input X contains NaN or infinity.")
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_estimators))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        out = np.empty((len(X), self.n_classes_))
+        for start in range(0, len(X), BLOCK_SIZE):
+            leaves = self.apply(X[start:start + BLOCK_SIZE])
+            # Sum tree by tree (cumsum is strictly sequential) to reproduce
+            # sklearn's accumulation order exactly
+            leaf_values = self.value[leaves.T]
+            out[start:start + BLOCK_SIZE] = np.cumsum(leaf_values, axis=0)[-1]
+        out /= self.n_estimators
+        return out
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else 'best_rf_model.pkl'
+    output_path = sys.argv[2] if len(sys.argv) > 2 else 'best_rf_model_flat.npz'
+
+    print("=" * 70)
+    print("  FLAT FOREST EXPORT")
+    print("=" * 70)
+
+    with open(model_path, 'rb') as f:
+        rf_model = pickle.load(f)
+    flat = FlatForest.from_sklearn(rf_model)
+    flat.save(output_path)
+
+    print(f"✓ Exported {flat.n_estimators} trees, {len(flat.feature):,} nodes "
+          f"(max depth {flat.max_depth}) to '{output_path}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,6 @@
 """
 This script inspects and displays the contents of PKL files
-Use this to see what's inside best_rf_model.pkl and label_encoders.pkl
+Use this to see what's inside best_rf_model.pkl, label_encoders.pkl and best_rf_model.rnf
 
 Usage: python inspect_pkl.py
 """
@@ -8,6 +8,8 @@ Usage: python inspect_pkl.py
 import pickle
 import os
 
+from model_artifact import read_header
+
 print("=" * 70)
 print("  PKL FILE INSPECTOR")
 print("=" * 70)
@@ -94,36 +96,55 @@ except FileNotFoundError:
 except Exception as e:
     print(f"❌ Error: {e}")
 
+# ============================================================================
+# INSPECT best_rf_model.rnf (header only, nothing is unpickled)
+# ============================================================================
+
+print("\n\n[3] Inspecting best_rf_model.rnf")
+print("-" * 70)
+
+try:
+    header = read_header('best_rf_model.rnf')
+    metadata = header['metadata']
+
+    print(f"✓ Header loaded successfully!")
+    print(f"  Format version: {header['format_version']}")
+    print(f"  Size: {os.path.getsize('best_rf_model.rnf')} bytes")
+
+    print(f"\n  Forest:")
+    print(f"     Number of trees: {header['n_estimators']}")
+    print(f"     Total nodes: {header['n_nodes']:,}")
+    print(f"     Max depth: {header['max_depth']}")
+    print(f"     Classes: {header['classes']}")
+    print(f"     Feature order: {', '.join(header['feature_names'])}")
+
+    print(f"\n  Training metadata:")
+    for key in ('data', 'training_samples', 'train_accuracy', 'created'):
+        if key in metadata:
+            print(f"     {key}: {metadata[key]}")
+
+    print(f"\n  Encoders: {', '.join(header['encoders']) or 'none'}")
+
+except FileNotFoundError:
+    print("❌ File not found! Run 'python create_model_pkl.py' first")
+except Exception as e:
+    print(f"❌ Error: {e}")
+
 # ============================================================================
 # CREATE MANUAL ENCODERS (Alternative method)
 # ============================================================================
 
-print("\n\n[3] Alternative: Create Encoders Manually")
+print("\n\n[4] Alternative: Create Encoders Manually")
 print("-" * 70)
 print("""
 If you want to create label_encoders.pkl manually without training:
 
-from sklearn.preprocessing import LabelEncoder
 import pickle
+from feature_schema import build_label_encoders
 
-# Create encoders
-encoders = {
-    'Sex': LabelEncoder().fit(['Female', 'Male']),
-    'AgeCategory': LabelEncoder().fit([
-        '18-24', '25-29', '30-34', '35-39', '40-44', '45-49',
-        '50-54', '55-59', '60-64', '65-69', '70-74', '75-79', '80 or older'
-    ]),
-    'Race': LabelEncoder().fit([
-        'White', 'Black', 'Asian', 'American Indian/Alaskan Native', 
-        'Hispanic', 'Other'
-    ]),
-    'Diabetic': LabelEncoder().fit([
-        'No', 'No, borderline diabetes', 'Yes', 'Yes (during pregnancy)'
-    ]),
-    'GenHealth': LabelEncoder().fit([
-        'Excellent', 'Very good', 'Good', 'Fair', 'Poor'
-    ])
-}
+# Classes in feature_schema code order (LabelEncoder().fit would sort them
+# alphabetically, which does not match the model's input encoding)
+encoders = build_label_encoders()
 
 # Save
 with open('label_encoders.pkl', 'wb') as f:
@@ -0,0 +1,94 @@
+"""
+Lookup-table engine in front of a fitted forest for interactive what-if use.
+Every feature except BMI is a small integer category, and the forest's output
+only changes when BMI crosses one of its split thresholds. Rows are therefore
+keyed on (BMI interval, other 16 features) and cached in a bounded LRU, so
+repeat or near-repeat queries are answered without walking the trees.
+Large batches (bulk scoring) bypass the table: they would mostly miss and
+evict the interactive entries.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+BMI_INDEX = 0
+
+
+def split_thresholds(forest, feature_index):
+    """Sorted unique thresholds the forest uses to split on feature_index."""
+    if hasattr(forest, 'estimators_'):
+        thresholds = [
+            est.tree_.threshold[(est.tree_.feature == feature_index) & (est.tree_.children_left != -1)]
+            for est in forest.estimators_
+        ]
+        thresholds = np.concatenate(thresholds)
+    else:
+        # FlatForest: leaves are the nodes that point back at themselves
+        internal = forest.left != np.arange(len(forest.left))
+        thresholds = forest.threshold[internal & (forest.feature == feature_index)]
+    return np.unique(thresholds)
+
+
+class LookupForest:
+    """Caches forest probabilities per (BMI interval, discrete features) key."""
+
+    def __init__(self, forest, max_entries=100_000, bucketed_feature=BMI_INDEX,
+                 max_cached_batch=1_024):
+        self.forest = forest
+        self.classes_ = forest.classes_
+        self.max_entries = max_entries
+        self.max_cached_batch = max_cached_batch
+        self.bucketed_feature = bucketed_feature
+        self.cut_points = split_thresholds(forest, bucketed_feature)
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _keys(self, X):
+        # The trees compare float32 inputs, so bucket on the float32 value:
+        # two values share an interval iff they fall on the same side of
+        # every threshold
+        bucket_values = X[:, self.bucketed_feature].astype(np.float32)
+        buckets = np.searchsorted(self.cut_points, bucket_values, side='left')
+        rest = np.delete(X, self.bucketed_feature, axis=1)
+        return [(int(b),) + tuple(row) for b, row in zip(buckets, rest.tolist())]
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) > self.max_cached_batch:
+            return self.forest.predict_proba(X)
+        keys = self._keys(X)
+        out = np.empty((len(X), len(self.classes_)))
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    out[i] = cached
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            # Evaluate all misses in one forest call
+            out[missing] = self.forest.predict_proba(X[missing])
+            with self._lock:
+                for i in missing:
+                    self._cache[keys[i]] = out[i].copy()
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return out
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
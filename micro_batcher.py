@@ -0,0 +1,144 @@
+"""
+Adaptive micro-batching in front of a model's predict_proba.
+Concurrent callers submit rows and get a Future back; a background thread
+flushes queued rows as one predict_proba call when max_batch_size rows are
+waiting or the oldest request has waited max_wait_ms.
+
+The wait is adaptive: while traffic is sparse (recent batches held about one
+request each) a lone request is flushed immediately instead of paying the
+max_wait_ms delay, and waiting kicks in again once requests start overlapping.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    def __init__(self, model, max_batch_size=64, max_wait_ms=2.0, idle_timeout=60.0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.idle_timeout = idle_timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        # Exponentially weighted average of requests per flushed batch
+        self._requests_per_batch = 1.0
+
+        self.batches = 0
+        self.requests = 0
+        self.rows = 0
+        self._fill_ratio_sum = 0.0
+        self._queue_delays = deque(maxlen=10_000)
+
+    def submit(self, X):
+        """Queue rows for scoring; the Future resolves to their probabilities."""
+        future = Future()
+        X = np.asarray(X)
+        if X.ndim != 2:
+            future.set_exception(ValueError(f"Expected a 2-D array, got {X.ndim}-D"))
+            return future
+        with self._lock:
+            self._queue.put((X, future, time.perf_counter()))
+            # The worker exits after idle_timeout, so a reloaded model never
+            # leaves a thread behind; start a fresh one on demand
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+        return future
+
+    def predict_proba(self, X):
+        return self.submit(X).result()
+
+    def _collect(self, first):
+        items = [first]
+        rows = len(first[0])
+        wait = self._requests_per_batch >= 1.5
+        deadline = first[2] + self.max_wait
+        while rows < self.max_batch_size:
+            try:
+                if wait:
+                    timeout = deadline - time.perf_counter()
+                    if timeout <= 0:
+                        break
+                    item = self._queue.get(timeout=timeout)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            items.append(item)
+            rows += len(item[0])
+        return items, rows
+
+    def _score(self, items):
+        """Resolve the items' futures from one predict_proba call.
+
+        If the batch fails, its items are scored one at a time, so a bad
+        submit (wrong column count, NaN) only fails its own future.
+        """
+        try:
+            X = np.concatenate([X for X, _, _ in items])
+            probas = self.model.predict_proba(X)
+        except Exception as exc:
+            if len(items) == 1:
+                items[0][1].set_exception(exc)
+            else:
+                for item in items:
+                    self._score([item])
+            return
+        start = 0
+        for X_item, future, _ in items:
+            future.set_result(probas[start:start + len(X_item)])
+            start += len(X_item)
+
+    def _run(self):
+        try:
+            self._serve()
+        finally:
+            # Only reached with _worker still set if _serve raised; clear it so
+            # queued and future requests get a new worker instead of hanging
+            with self._lock:
+                if self._worker is threading.current_thread():
+                    self._worker = None
+                    if not self._queue.empty():
+                        self._worker = threading.Thread(target=self._run, daemon=True)
+                        self._worker.start()
+
+    def _serve(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._worker = None
+                        return
+                continue
+
+            items, rows = self._collect(first)
+            flushed_at = time.perf_counter()
+            self._score(items)
+
+            self.batches += 1
+            self.requests += len(items)
+            self.rows += rows
+            self._fill_ratio_sum += min(rows / self.max_batch_size, 1.0)
+            self._queue_delays.extend(flushed_at - enqueued for _, _, enqueued in items)
+            self._requests_per_batch = 0.8 * self._requests_per_batch + 0.2 * len(items)
+
+    def stats(self):
+        delays = np.array(self._queue_delays) * 1e3
+        return {
+            'batches': self.batches,
+            'requests': self.requests,
+            'rows': self.rows,
+            'mean_batch_rows': self.rows / self.batches if self.batches else 0.0,
+            'mean_fill_ratio': self._fill_ratio_sum / self.batches if self.batches else 0.0,
+            'mean_queue_delay_ms': float(delays.mean()) if len(delays) else 0.0,
+            'p95_queue_delay_ms': float(np.percentile(delays, 95)) if len(delays) else 0.0,
+        }
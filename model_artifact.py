@@ -0,0 +1,241 @@
+"""
+Compact, versioned model artifact for the RuleNet forest.
+
+Layout of a .rnf file:
+    8 bytes   magic b'RULENET\\0'
+    4 bytes   format version (uint32, little endian)
+    4 bytes   header length in bytes (uint32, little endian)
+    header    UTF-8 JSON: feature order, encoder classes, training metadata
+              and the dtype / shape / offset of every array
+    arrays    FlatForest node arrays, each starting on a 64-byte boundary
+              (format version 2 may store them quantized, see compress_forest.py)
+
+The arrays are stored in the exact dtypes FlatForest evaluates with, so
+loading with mmap=True builds the forest as read-only views of the file:
+cold start only parses the header, and every process that maps the same file
+shares its physical pages.
+
+Usage: python model_artifact.py [best_rf_model.pkl] [best_rf_model.rnf]
+"""
+
+import json
+import os
+import pickle
+import struct
+import sys
+import time
+
+import numpy as np
+
+from feature_schema import FEATURE_COLUMNS, build_label_encoders
+from flat_forest import FlatForest
+
+MAGIC = b'RULENET\0'
+FORMAT_VERSION = 2  # 2 adds quantized arrays; version 1 files are still read
+ALIGNMENT = 64
+PREAMBLE = struct.Struct('<8sII')
+
+ARRAY_DTYPES = {
+    'feature': '<i8',
+    'threshold': '<f8',
+    'left': '<i8',
+    'right': '<i8',
+    'value': '<f8',
+    'roots': '<i8',
+}
+
+# Quantized storage (see compress_forest.py): float16 thresholds, leaf
+# probabilities as uint8 steps of 1/VALUE_SCALE. Loading dequantizes into a
+# private copy, so these artifacts trade page sharing for size.
+QUANTIZED_DTYPES = {
+    'feature': '|i1',
+    'threshold': '<f2',
+    'left': '<i4',
+    'right': '<i4',
+    'value': '|u1',
+    'roots': '<i4',
+}
+VALUE_SCALE = 255
+
+
+def quantize_values(value):
+    return np.round(np.asarray(value) * VALUE_SCALE).astype(np.uint8)
+
+
+def dequantize_values(codes):
+    """Class probabilities per node from uint8 codes. Rounding can leave a row
+    summing to 254/255 or 256/255, so each row is renormalized to sum to 1."""
+    value = codes.astype(np.float64)
+    return value / value.sum(axis=1, keepdims=True)
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_artifact(path, forest, feature_names, encoders=None, metadata=None, quantized=False):
+    """Write a FlatForest (plus encoder classes and metadata) to path."""
+    dtypes = QUANTIZED_DTYPES if quantized else ARRAY_DTYPES
+    arrays = {name: np.ascontiguousarray(getattr(forest, name)) for name in dtypes}
+    if quantized:
+        arrays['value'] = quantize_values(arrays['value'])
+    arrays = {name: np.ascontiguousarray(array, dtype=dtypes[name]) for name, array in arrays.items()}
+    version = 2 if quantized else 1
+    header = {
+        'format_version': version,
+        'quantized': quantized,
+        'feature_names': list(feature_names),
+        'classes': np.asarray(forest.classes_).tolist(),
+        'max_depth': forest.max_depth,
+        'n_estimators': forest.n_estimators,
+        'n_nodes': len(forest.feature),
+        'encoders': {name: [str(c) for c in encoder.classes_]
+                     for name, encoder in (encoders or {}).items()},
+        'metadata': metadata or {},
+        'arrays': {},
+    }
+
+    # Offsets depend on the header size and vice versa: grow the space
+    # reserved for the header until the laid-out header fits in it
+    reserved = 0
+    while True:
+        offset = _aligned(PREAMBLE.size + reserved)
+        for name, array in arrays.items():
+            header['arrays'][name] = {
+                'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset,
+            }
+            offset = _aligned(offset + array.nbytes)
+        header_bytes = json.dumps(header, default=str).encode()
+        if len(header_bytes) <= reserved:
+            break
+        reserved = len(header_bytes) + 64
+    header_bytes = header_bytes.ljust(reserved)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, version, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b'\0' * (header['arrays'][name]['offset'] - f.tell()))
+            f.write(array.tobytes())
+    # Atomic replace, so processes watching the mtime never see a partial file
+    os.replace(tmp_path, path)
+
+
+def read_header(path):
+    """Parse only the JSON header (no array data is read)."""
+    with open(path, 'rb') as f:
+        magic, version, header_len = PREAMBLE.unpack(f.read(PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not a RuleNet model artifact")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"'{path}' uses format version {version}; "
+                             f"this code reads up to version {FORMAT_VERSION}")
+        return json.loads(f.read(header_len))
+
+
+def load_artifact(path, mmap=True):
+    """Return (FlatForest, header). With mmap=True the arrays are read-only file views."""
+    header = read_header(path)
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode='r')
+    else:
+        with open(path, 'rb') as f:
+            buffer = np.frombuffer(f.read(), dtype=np.uint8)
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape']))
+        start = spec['offset']
+        arrays[name] = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(spec['shape'])
+
+    if header.get('quantized'):
+        arrays['value'] = dequantize_values(arrays['value'])
+
+    # Arrays already in FlatForest's dtypes are used as-is (no copy)
+    forest = FlatForest(
+        arrays['feature'], arrays['threshold'], arrays['left'], arrays['right'],
+        arrays['value'], arrays['roots'], header['max_depth'], np.array(header['classes'])
+    )
+    return forest, header
+
+
+def _smaps_fields(lines):
+    fields = {}
+    for line in lines:
+        key, _, rest = line.partition(':')
+        parts = rest.split()
+        if len(parts) == 2 and parts[1] == 'kB':
+            fields[key] = fields.get(key, 0) + int(parts[0])
+    return fields
+
+
+def process_memory_report(mapped_path=None):
+    """Resident vs shared memory of this process in KB, from /proc (Linux only).
+
+    With mapped_path, also reports how much of that file's mapping is resident
+    and how much of it is shared with other processes. Returns None elsewhere.
+    """
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            rollup = _smaps_fields(f)
+    except OSError:
+        return None
+
+    report = {
+        'pid': os.getpid(),
+        'rss_kb': rollup.get('Rss', 0),
+        'pss_kb': rollup.get('Pss', 0),
+        'shared_kb': rollup.get('Shared_Clean', 0) + rollup.get('Shared_Dirty', 0),
+        'private_kb': rollup.get('Private_Clean', 0) + rollup.get('Private_Dirty', 0),
+    }
+    if mapped_path:
+        target = os.path.realpath(mapped_path)
+        mapping_lines, in_target = [], False
+        with open('/proc/self/smaps') as f:
+            for line in f:
+                first = line.split(None, 1)[0]
+                if '-' in first and not first.endswith(':'):
+                    # Mapping header: "start-end perms offset dev inode [path]"
+                    in_target = line.rstrip('\n').endswith(' ' + target)
+                elif in_target:
+                    mapping_lines.append(line)
+        mapped = _smaps_fields(mapping_lines)
+        report['model_mapped_rss_kb'] = mapped.get('Rss', 0)
+        report['model_mapped_shared_kb'] = mapped.get('Shared_Clean', 0) + mapped.get('Shared_Dirty', 0)
+    return report
+
+
+def format_memory_report(report):
+    line = (f"pid {report['pid']}: RSS {report['rss_kb'] / 1024:.1f} MB "
+            f"(shared {report['shared_kb'] / 1024:.1f} MB, "
+            f"private {report['private_kb'] / 1024:.1f} MB, PSS {report['pss_kb'] / 1024:.1f} MB)")
+    if 'model_mapped_rss_kb' in report:
+        line += (f"; model file resident {report['model_mapped_rss_kb'] / 1024:.1f} MB, "
+                 f"shared {report['model_mapped_shared_kb'] / 1024:.1f} MB")
+    return line
+
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else 'best_rf_model.pkl'
+    output_path = sys.argv[2] if len(sys.argv) > 2 else 'best_rf_model.rnf'
+
+    print("=" * 70)
+    print("  MODEL ARTIFACT EXPORT")
+    print("=" * 70)
+
+    with open(model_path, 'rb') as f:
+        rf_model = pickle.load(f)
+    # Encoder classes come from the feature schema, never an older pickle
+    save_artifact(output_path, FlatForest.from_sklearn(rf_model), FEATURE_COLUMNS,
+                  build_label_encoders(),
+                  metadata={'source': model_path, 'params': rf_model.get_params(),
+                            'created': time.strftime('%Y-%m-%dT%H:%M:%S')})
+
+    print(f"✓ '{model_path}' ({os.path.getsize(model_path) / 1024:.2f} KB) → "
+          f"'{output_path}' ({os.path.getsize(output_path) / 1024:.2f} KB)")
+
+
+if __name__ == '__main__':
+    main()
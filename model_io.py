@@ -0,0 +1,45 @@
+"""
+File and data helpers shared by the model scripts and the app: where a
+model's evaluation results live, the checksum that ties results to a model
+file, and labelled holdout / update batches. It imports only pandas and
+feature_schema at load time (the data generator only when a synthetic batch
+is asked for), not sklearn or the scoring and benchmark scripts.
+
+Usage: from model_io import evaluation_path, file_sha256, load_holdout
+"""
+
+import hashlib
+import os
+
+import pandas as pd
+
+from feature_schema import encode_frame
+
+
+def evaluation_path(model_path):
+    """The evaluate_model.py results file of a model: <model>_eval.json."""
+    return os.path.splitext(model_path)[0] + '_eval.json'
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_holdout(path, n_samples, seed):
+    """(X, y) from a labelled CSV/Parquet file, or n_samples synthetic rows when path is None."""
+    from synthetic_data import LABEL_COLUMN, generate
+
+    if path is None:
+        # A seed the trainer never uses, so these rows are unseen
+        return generate(n_samples, seed=seed)
+    data = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+    labels = data[LABEL_COLUMN]
+    if pd.api.types.is_numeric_dtype(labels):
+        y = labels.to_numpy(dtype=int)
+    else:
+        y = (labels == 'Yes').to_numpy(dtype=int)
+    return encode_frame(data), y
@@ -0,0 +1,103 @@
+"""
+Process-pool engine in front of a forest for multi-million-row batches.
+The rules are cheap vectorized masks; scoring time is spent in the forest on
+the rows the rules defer. ParallelForest stands in for the forest inside
+RuleNetClassifier and splits those rows into chunks, which a pool of worker
+processes scores in parallel. Each worker loads the model once (an .rnf
+artifact is memory-mapped, so the workers share its pages) and results are
+reassembled in input order, so outputs are identical to a serial call.
+
+Small batches stay in the calling process: below a few tens of thousands of
+rows, shipping them to a worker costs more than scoring them.
+
+Workers are spawned and re-import the caller's __main__, so use it from
+scripts guarded by `if __name__ == '__main__':` (the CLIs, serve_api.py).
+
+Usage: model = RuleNetClassifier(ParallelForest('best_rf_model.rnf', workers=8))
+"""
+
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model_artifact import load_artifact
+
+_worker_forest = None
+
+
+def load_forest(model_path):
+    """Flat forest of an .rnf artifact (memory-mapped) or a pickled sklearn
+    forest, scoring on a single thread: the parallelism comes from the processes."""
+    if model_path.endswith('.rnf'):
+        forest, _ = load_artifact(model_path)
+        return forest
+    with open(model_path, 'rb') as f:
+        forest = pickle.load(f)
+    # Pickles keep the trainer's n_jobs=-1, which would start a thread per CPU
+    # in every worker
+    forest.set_params(n_jobs=1)
+    return forest
+
+
+def _init_worker(model_path):
+    global _worker_forest
+    _worker_forest = load_forest(model_path)
+
+
+def _predict_proba_chunk(X):
+    return _worker_forest.predict_proba(X)
+
+
+class ParallelForest:
+    """Scores large batches on a pool of worker processes, preserving row order."""
+
+    def __init__(self, model_path, workers=None, chunk_size=None, min_parallel_rows=20_000):
+        self.model_path = model_path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.min_parallel_rows = min_parallel_rows
+        # Small batches are scored here; the pages are shared with the workers
+        self.forest = load_forest(model_path)
+        self.classes_ = self.forest.classes_
+        # spawn rather than fork: the Streamlit and API processes are threaded
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(model_path,),
+        )
+
+    def chunk_bounds(self, n_rows):
+        """(start, stop) per chunk; by default about four chunks per worker,
+        so a slow chunk does not leave the other workers idle at the end."""
+        chunk_size = self.chunk_size or max(5_000, -(-n_rows // (4 * self.workers)))
+        return [(start, min(start + chunk_size, n_rows)) for start in range(0, n_rows, chunk_size)]
+
+    def predict_proba(self, X):
+        if len(X) < self.min_parallel_rows:
+            return self.forest.predict_proba(X)
+        # Both forests compare float32 inputs: convert once, and ship half the bytes
+        X = np.asarray(X, dtype=np.float32)
+        chunks = [X[start:stop] for start, stop in self.chunk_bounds(len(X))]
+        # Workers are started on demand, inside map
+        results = self._pool.map(_predict_proba_chunk, chunks)
+        return np.concatenate(list(results))
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def warm_up(self):
+        """Start every worker and load its model now rather than on the first batch."""
+        futures = [self._pool.submit(os.getpid) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
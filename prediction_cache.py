@@ -0,0 +1,72 @@
+"""
+Process-wide memo of RuleNetClassifier.predict_proba results.
+Rows are keyed on a hash of the encoded 17-feature vector plus the model
+artifact version; entries are evicted LRU and the whole cache is dropped
+as soon as a different artifact version is seen.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def row_key(row):
+    """Canonical digest of one encoded feature row."""
+    # float64 so 1 and 1.0 hash the same; adding 0.0 folds -0.0 into 0.0
+    canonical = np.ascontiguousarray(row, dtype=np.float64) + 0.0
+    return hashlib.blake2b(canonical.tobytes(), digest_size=16).digest()
+
+
+class PredictionCache:
+    def __init__(self, max_entries=10_000):
+        self.max_entries = max_entries
+        self.model_version = None
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def invalidate(self, model_version=None):
+        with self._lock:
+            self._cache.clear()
+            self.model_version = model_version
+
+    def predict_proba(self, model, X, model_version):
+        X = np.asarray(X)
+        if model_version != self.model_version:
+            self.invalidate(model_version)
+
+        keys = [(model_version, row_key(row)) for row in X]
+        out = np.empty((len(X), 2))
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    out[i] = cached
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            out[missing] = model.predict_proba(X[missing])
+            with self._lock:
+                for i in missing:
+                    self._cache[keys[i]] = out[i].copy()
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return out
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._cache),
+            'hit_rate': self.hits / total if total else 0.0,
+            'model_version': self.model_version,
+        }
@@ -0,0 +1,248 @@
+"""
+RuleNet hybrid classifier: explicit medical rules with a Random Forest fallback.
+Shared by the Streamlit app and the offline scoring scripts.
+
+Rules are data: each has a name, a list of conditions (feature, operator,
+value) that must all hold, an outcome (0 or 1), a confidence and a priority.
+They are compiled into vectorized masks over the feature matrix; the
+matching rule with the lowest priority number decides a row, and rows no rule
+matches are deferred to the forest. A JSON rule file can replace the defaults:
+
+[
+  {"name": "High BMI and Poor Physical Health", "priority": 1, "outcome": 1,
+   "when": [{"feature": "BMI", "op": ">", "value": 35},
+            {"feature": "PhysicalHealth", "op": ">", "value": 15}]},
+  ...
+]
+"""
+
+import json
+import threading
+import time
+
+import numpy as np
+
+from feature_schema import FEATURE_COLUMNS
+
+DEFAULT_RULES = [
+    {
+        'name': 'High BMI and Poor Physical Health',
+        'priority': 1, 'outcome': 1, 'confidence': 0.9,
+        'when': [
+            {'feature': 'BMI', 'op': '>', 'value': 35},
+            {'feature': 'PhysicalHealth', 'op': '>', 'value': 15},
+        ],
+    },
+    {
+        'name': 'Smoking and Older Age',
+        'priority': 2, 'outcome': 1, 'confidence': 0.9,
+        'when': [
+            {'feature': 'Smoking', 'op': '==', 'value': 1},
+            {'feature': 'AgeCategory', 'op': '>=', 'value': 10},
+        ],
+    },
+    {
+        # Kept exactly as the original rule, which compared column 14 (Asthma,
+        # 0/1) rather than SleepTime, so it never fires. Testing SleepTime
+        # instead changes predictions; do that through a rule file.
+        'name': 'Good Sleep and No Mental Health Issues',
+        'priority': 3, 'outcome': 0, 'confidence': 0.9,
+        'when': [
+            {'feature': 'Asthma', 'op': '>=', 'value': 8},
+            {'feature': 'MentalHealth', 'op': '==', 'value': 0},
+        ],
+    },
+]
+
+OPERATORS = {
+    '>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal,
+    '==': np.equal, '!=': np.not_equal,
+}
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (not thread-safe; callers hold a lock)."""
+
+    BOUNDS_MS = np.array([0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000])
+
+    def __init__(self):
+        self.counts = np.zeros(len(self.BOUNDS_MS) + 1, dtype=np.int64)
+        self.total_seconds = 0.0
+
+    def observe(self, seconds):
+        self.counts[np.searchsorted(self.BOUNDS_MS, seconds * 1e3)] += 1
+        self.total_seconds += seconds
+
+    def quantile_ms(self, q):
+        """Upper bound of the bucket holding quantile q (None past the last bound)."""
+        count = self.counts.sum()
+        if count == 0:
+            return 0.0
+        bucket = int(np.searchsorted(np.cumsum(self.counts), q * count))
+        return float(self.BOUNDS_MS[bucket]) if bucket < len(self.BOUNDS_MS) else None
+
+    def snapshot(self):
+        count = int(self.counts.sum())
+        return {
+            'count': count,
+            'total_seconds': self.total_seconds,
+            'mean_ms': self.total_seconds / count * 1e3 if count else 0.0,
+            'p50_ms': self.quantile_ms(0.50),
+            'p95_ms': self.quantile_ms(0.95),
+            'p99_ms': self.quantile_ms(0.99),
+            'buckets': [{'le_ms': None if bound is None else float(bound), 'count': int(n)}
+                        for bound, n in zip(list(self.BOUNDS_MS) + [None], self.counts)],
+        }
+
+
+def load_rules(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compile_rules(rules, feature_names=FEATURE_COLUMNS):
+    """Validate a rule table and sort it by priority, resolving feature indices."""
+    compiled = []
+    for rule in sorted(rules, key=lambda r: r.get('priority', 0)):
+        if rule['outcome'] not in (0, 1):
+            raise ValueError(f"Rule '{rule['name']}' outcome must be 0 or 1")
+        conditions = []
+        for cond in rule['when']:
+            if cond['feature'] not in feature_names:
+                raise ValueError(f"Rule '{rule['name']}' uses unknown feature '{cond['feature']}'")
+            if cond['op'] not in OPERATORS:
+                raise ValueError(f"Rule '{rule['name']}' uses unknown operator '{cond['op']}'")
+            conditions.append((feature_names.index(cond['feature']), OPERATORS[cond['op']],
+                               float(cond['value'])))
+        confidence = float(rule.get('confidence', 0.9))
+        # Rounded so a confidence of 0.9 gives exactly [0.1, 0.9]
+        p_disease = confidence if rule['outcome'] == 1 else round(1.0 - confidence, 12)
+        compiled.append({
+            'name': rule['name'],
+            'outcome': rule['outcome'],
+            'proba': np.array([round(1.0 - p_disease, 12), p_disease]),
+            'conditions': conditions,
+        })
+    return compiled
+
+
+class RuleNetClassifier:
+    def __init__(self, rf_model, rules=None):
+        self.rf_model = rf_model
+        self.rules = compile_rules(DEFAULT_RULES if rules is None else rules)
+        self._outcomes = np.array([r['outcome'] for r in self.rules], dtype=int)
+        self._probas = np.array([r['proba'] for r in self.rules]).reshape(-1, 2)
+
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the per-rule hit counters, deferral counts and timing histograms."""
+        with self._stats_lock:
+            self.calls = 0
+            self.rows = 0
+            self.rule_hits = np.zeros(len(self.rules), dtype=np.int64)
+            self.deferred_rows = 0
+            self.forest_calls = 0
+            self.forest_rows = 0
+            self.forest_seconds = 0.0
+            self.rules_latency = LatencyHistogram()
+            self.forest_latency = LatencyHistogram()
+
+    def predict(self, X):
+        X = np.asarray(X)
+        final_preds = self.apply_rules(X)
+
+        # Only rows no rule fired on go to the forest, in a single call
+        deferred = final_preds == -1
+        if deferred.any():
+            rf_preds = self._forest_call(self.rf_model.predict, X[deferred])
+            final_preds = final_preds.astype(np.result_type(final_preds, rf_preds))
+            final_preds[deferred] = rf_preds
+
+        return final_preds
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        matched = self.match_rules(X)
+        probas = np.empty((len(X), 2))
+
+        # Rule-based prediction
+        fired = matched != -1
+        probas[fired] = self._probas[matched[fired]]
+
+        # ML-based prediction
+        deferred = ~fired
+        if deferred.any():
+            probas[deferred] = self._forest_call(self.rf_model.predict_proba, X[deferred])
+        return probas
+
+    def apply_rules(self, X):
+        """Outcome of the deciding rule per row, or -1 where the forest decides."""
+        matched = self.match_rules(X)
+        return np.where(matched == -1, -1, self._outcomes[matched])
+
+    def match_rules(self, X):
+        """Index of the deciding rule per row (-1 if none), counting hits."""
+        X = np.asarray(X)
+        if len(X) == 0 or not self.rules:
+            return np.full(len(X), -1)
+
+        start = time.perf_counter()
+        masks = []
+        for rule in self.rules:
+            mask = np.ones(len(X), dtype=bool)
+            for column, op, value in rule['conditions']:
+                mask &= op(X[:, column], value)
+            masks.append(mask)
+
+        # np.select keeps the first (highest-priority) matching rule
+        matched = np.select(masks, np.arange(len(self.rules)), default=-1)
+        elapsed = time.perf_counter() - start
+
+        hits = np.bincount(matched[matched != -1], minlength=len(self.rules))
+        with self._stats_lock:
+            self.calls += 1
+            self.rows += len(X)
+            self.rule_hits += hits
+            self.deferred_rows += int((matched == -1).sum())
+            self.rules_latency.observe(elapsed)
+        return matched
+
+    def _forest_call(self, method, X):
+        start = time.perf_counter()
+        result = method(X)
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self.forest_calls += 1
+            self.forest_rows += len(X)
+            self.forest_seconds += elapsed
+            self.forest_latency.observe(elapsed)
+        return result
+
+    def rule_stats(self):
+        """Snapshot of the counters: per-rule hits and the forest time those
+        short-circuits saved, forest deferrals, and per-call latency histograms
+        for the rule masks and the forest."""
+        with self._stats_lock:
+            per_row = self.forest_seconds / self.forest_rows if self.forest_rows else 0.0
+            rules = [
+                {'name': rule['name'], 'outcome': rule['outcome'], 'hits': int(hits),
+                 'hit_rate': int(hits) / self.rows if self.rows else 0.0,
+                 'estimated_forest_seconds_saved': float(hits * per_row)}
+                for rule, hits in zip(self.rules, self.rule_hits)
+            ]
+            return {
+                'calls': self.calls,
+                'rows': self.rows,
+                'rules': rules,
+                'short_circuit_rows': self.rows - self.deferred_rows,
+                'deferred_rows': self.deferred_rows,
+                'deferral_rate': self.deferred_rows / self.rows if self.rows else 0.0,
+                'rules_seconds': self.rules_latency.total_seconds,
+                'forest_calls': self.forest_calls,
+                'forest_seconds': self.forest_seconds,
+                'forest_seconds_per_row': per_row,
+                'rules_latency': self.rules_latency.snapshot(),
+                'forest_latency': self.forest_latency.snapshot(),
+            }
@@ -1,7 +1,9 @@
 import pickle
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
+
+from feature_schema import build_label_encoders
+from synthetic_data import generate_features
 
 print("=" * 60)
 print("Heart Disease Prediction - Model & Encoder Generator")
@@ -20,41 +22,21 @@ rf_model = RandomForestClassifier(
 
 # Create dummy training data (17 features)
 print("[2/3] Generating training data...")
-np.random.seed(42)
+rng = np.random.RandomState(42)
 n_samples = 5000
 
 # Generate realistic-looking dummy data
-X_train = np.column_stack([
-    np.random.uniform(15, 50, n_samples),  # BMI
-    np.random.randint(0, 2, n_samples),    # Smoking
-    np.random.randint(0, 2, n_samples),    # AlcoholDrinking
-    np.random.randint(0, 2, n_samples),    # Stroke
-    np.random.randint(0, 31, n_samples),   # PhysicalHealth
-    np.random.randint(0, 31, n_samples),   # MentalHealth
-    np.random.randint(0, 2, n_samples),    # DiffWalking
-    np.random.randint(0, 2, n_samples),    # Sex
-    np.random.randint(0, 13, n_samples),   # AgeCategory
-    np.random.randint(0, 6, n_samples),    # Race
-    np.random.randint(0, 4, n_samples),    # Diabetic
-    np.random.randint(0, 2, n_samples),    # PhysicalActivity
-    np.random.randint(0, 5, n_samples),    # GenHealth
-    np.random.randint(4, 12, n_samples),   # SleepTime
-    np.random.randint(0, 2, n_samples),    # Asthma
-    np.random.randint(0, 2, n_samples),    # KidneyDisease
-    np.random.randint(0, 2, n_samples),    # SkinCancer
-])
+X_train = generate_features(n_samples, rng)
 
 # Generate target with some logic
-y_train = np.zeros(n_samples)
-for i in range(n_samples):
-    risk_score = 0
-    if X_train[i, 0] > 30: risk_score += 0.3  # High BMI
-    if X_train[i, 1] == 1: risk_score += 0.25  # Smoking
-    if X_train[i, 3] == 1: risk_score += 0.3   # Stroke
-    if X_train[i, 4] > 15: risk_score += 0.15  # Poor physical health
-    if X_train[i, 8] > 8: risk_score += 0.2    # Older age
-    
-    y_train[i] = 1 if risk_score > 0.5 or np.random.random() < 0.3 else 0
+risk_score = np.zeros(n_samples)
+risk_score += np.where(X_train[:, 0] > 30, 0.3, 0.0)   # High BMI
+risk_score += np.where(X_train[:, 1] == 1, 0.25, 0.0)  # Smoking
+risk_score += np.where(X_train[:, 3] == 1, 0.3, 0.0)   # Stroke
+risk_score += np.where(X_train[:, 4] > 15, 0.15, 0.0)  # Poor physical health
+risk_score += np.where(X_train[:, 8] > 8, 0.2, 0.0)    # Older age
+
+y_train = ((risk_score > 0.5) | (rng.random_sample(n_samples) < 0.3)).astype(float)
 
 print(f"   Training samples: {n_samples}")
 print(f"   Features: {X_train.shape[1]}")
@@ -77,42 +59,10 @@ print("   ✅ Model saved as 'best_rf_model.pkl'")
 
 # Create and save label encoders
 print("\n🔤 Creating label encoders...")
-label_encoders = {}
-
-# Sex encoder
-sex_encoder = LabelEncoder()
-sex_encoder.fit(['Female', 'Male'])
-label_encoders['Sex'] = sex_encoder
-print("   ✓ Sex encoder created")
-
-# AgeCategory encoder
-age_encoder = LabelEncoder()
-age_categories = ['18-24', '25-29', '30-34', '35-39', '40-44', '45-49', 
-                  '50-54', '55-59', '60-64', '65-69', '70-74', '75-79', '80 or older']
-age_encoder.fit(age_categories)
-label_encoders['AgeCategory'] = age_encoder
-print("   ✓ Age category encoder created")
-
-# Race encoder
-race_encoder = LabelEncoder()
-races = ['White', 'Black', 'Asian', 'American Indian/Alaskan Native', 'Hispanic', 'Other']
-race_encoder.fit(races)
-label_encoders['Race'] = race_encoder
-print("   ✓ Race encoder created")
-
-# Diabetic encoder
-diabetic_encoder = LabelEncoder()
-diabetic_categories = ['No', 'No, borderline diabetes', 'Yes', 'Yes (during pregnancy)']
-diabetic_encoder.fit(diabetic_categories)
-label_encoders['Diabetic'] = diabetic_encoder
-print("   ✓ Diabetic encoder created")
-
-# GenHealth encoder
-health_encoder = LabelEncoder()
-health_categories = ['Excellent', 'Very good', 'Good', 'Fair', 'Poor']
-health_encoder.fit(health_categories)
-label_encoders['GenHealth'] = health_encoder
-print("   ✓ General health encoder created")
+# Classes in feature_schema code order, matching how the model's inputs are encoded
+label_encoders = build_label_encoders()
+for name in label_encoders:
+    print(f"   ✓ {name} encoder created")
 
 # Save encoders
 print("\n💾 Saving label encoders...")
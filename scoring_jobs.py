@@ -0,0 +1,310 @@
+"""
+Local background scoring jobs.
+A JobQueue owns a pool of worker processes, each of which loads the RuleNet
+model once (an .rnf artifact is memory-mapped, so the workers share its
+pages). Submitted CSV / Parquet files are queued on the pool and streamed
+through score_batch.score_file by one worker each, so a large file never
+blocks the Streamlit session or HTTP handler that submitted it.
+
+Every job lives in its own directory under the jobs directory (jobs/):
+    <jobs_dir>/<job_id>/status.json   state, progress and throughput, rewritten
+                                      atomically after every chunk
+    <jobs_dir>/<job_id>/scored.csv    results (scored.parquet for Parquet input)
+Status is read from disk, so any process can query it, and finished results
+survive restarts. No external broker is involved.
+
+Spawned workers re-import the parent's __main__, which must therefore be a
+guarded script (this CLI, serve_api.py). The Streamlit app's __main__ is the
+app itself, so it uses a JobServer instead: the JobQueue then runs in a
+separate `scoring_jobs.py --serve` process, and submitting a job drops its id
+into that server's inbox directory.
+
+Usage: python scoring_jobs.py patients.csv more_patients.parquet --workers 2
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from parallel_forest import load_forest
+from rulenet import RuleNetClassifier, load_rules
+from score_batch import score_file
+
+STATUS_FILE = 'status.json'
+# Job ids made by create_job: submission time and a random suffix
+JOB_ID_PATTERN = re.compile(r'\d{8}-\d{6}-[0-9a-f]{6}')
+
+_worker_model = None
+
+
+def count_rows(path):
+    """Data rows in a CSV (newline count) or Parquet file (footer metadata)."""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).metadata.num_rows
+    lines, last = 0, b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def write_status(job_dir, status):
+    tmp_path = os.path.join(job_dir, STATUS_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(status, f, indent=2)
+    # Atomic replace, so readers never see a half-written file
+    os.replace(tmp_path, os.path.join(job_dir, STATUS_FILE))
+
+
+def read_status(job_dir):
+    with open(os.path.join(job_dir, STATUS_FILE)) as f:
+        return json.load(f)
+
+
+def create_job(jobs_dir, input_path, model_path, job_id=None):
+    """Create a queued job's directory and status; returns the job id."""
+    job_id = job_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    job_dir = os.path.join(jobs_dir, job_id)
+    os.makedirs(job_dir)
+    extension = '.parquet' if input_path.endswith('.parquet') else '.csv'
+    write_status(job_dir, {
+        'job_id': job_id,
+        'state': 'queued',
+        'input': os.path.abspath(input_path),
+        'output': os.path.abspath(os.path.join(job_dir, 'scored' + extension)),
+        'model': model_path,
+        'submitted': time.time(),
+        'rows_total': None,
+        'rows_done': 0,
+        'progress': 0.0,
+        'rows_per_sec': None,
+    })
+    return job_id
+
+
+def job_status(jobs_dir, job_id):
+    """Current status dict of a job, or None if it does not exist."""
+    job_dir = os.path.join(jobs_dir, job_id)
+    if not os.path.exists(os.path.join(job_dir, STATUS_FILE)):
+        return None
+    status = read_status(job_dir)
+    if status['state'] == 'running' and status.get('rows_per_sec'):
+        remaining = (status['rows_total'] or 0) - status['rows_done']
+        status['eta_seconds'] = max(remaining, 0) / status['rows_per_sec']
+    return status
+
+
+def list_jobs(jobs_dir):
+    """Status of every job on disk, newest first."""
+    statuses = [job_status(jobs_dir, job_id) for job_id in os.listdir(jobs_dir)]
+    return sorted((s for s in statuses if s is not None),
+                  key=lambda s: s['submitted'], reverse=True)
+
+
+def _init_worker(model_path, rules_path):
+    global _worker_model
+    # load_forest keeps each worker on one thread, whatever the pickle's n_jobs
+    _worker_model = RuleNetClassifier(load_forest(model_path),
+                                      load_rules(rules_path) if rules_path else None)
+
+
+def _run_job(job_dir, chunk_size):
+    status = read_status(job_dir)
+    status.update(state='running', started=time.time(),
+                  rows_total=count_rows(status['input']), worker_pid=os.getpid())
+    write_status(job_dir, status)
+
+    def on_chunk(rows_done, elapsed):
+        status.update(rows_done=rows_done,
+                      progress=min(100.0, 100.0 * rows_done / max(status['rows_total'], 1)),
+                      rows_per_sec=rows_done / max(elapsed, 1e-9))
+        write_status(job_dir, status)
+
+    try:
+        rows, seconds = score_file(_worker_model, status['input'], status['output'],
+                                   chunk_size, on_chunk)
+    except Exception as exc:
+        status.update(state='failed', finished=time.time(), error=f"{type(exc).__name__}: {exc}")
+        write_status(job_dir, status)
+        raise
+    status.update(state='completed', finished=time.time(), rows_total=rows, rows_done=rows,
+                  progress=100.0, rows_per_sec=rows / max(seconds, 1e-9), seconds=seconds)
+    write_status(job_dir, status)
+    return status
+
+
+class JobQueue:
+    """Queue of scoring jobs on a local pool of model-holding worker processes."""
+
+    def __init__(self, model_path, jobs_dir='jobs', workers=2, chunk_size=50_000,
+                 rules_path=None):
+        self.model_path = model_path
+        self.jobs_dir = jobs_dir
+        self.chunk_size = chunk_size
+        os.makedirs(jobs_dir, exist_ok=True)
+        # spawn rather than fork: the Streamlit and API processes are threaded
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(model_path, rules_path),
+        )
+        self._futures = {}
+
+    def submit(self, input_path, job_id=None):
+        """Queue input_path for scoring and return the new job's id."""
+        job_id = create_job(self.jobs_dir, input_path, self.model_path, job_id)
+        self.enqueue(job_id)
+        return job_id
+
+    def enqueue(self, job_id):
+        """Queue a job already created on disk with create_job."""
+        job_dir = os.path.join(self.jobs_dir, job_id)
+        # Workers are started on demand, inside submit
+        future = self._pool.submit(_run_job, job_dir, self.chunk_size)
+        future.add_done_callback(lambda f: self._record_crash(job_dir, f))
+        self._futures[job_id] = future
+
+    def _record_crash(self, job_dir, future):
+        # A worker that died (e.g. out of memory) never wrote its own failure
+        if future.cancelled() or future.exception() is None:
+            return
+        status = read_status(job_dir)
+        if status['state'] not in ('completed', 'failed'):
+            status.update(state='failed', finished=time.time(), error=repr(future.exception()))
+            write_status(job_dir, status)
+
+    def status(self, job_id):
+        return job_status(self.jobs_dir, job_id)
+
+    def jobs(self):
+        return list_jobs(self.jobs_dir)
+
+    def wait(self, job_id, timeout=None):
+        return self._futures[job_id].result(timeout)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+class JobServer:
+    """A JobQueue in a separate `scoring_jobs.py --serve` process.
+
+    Same submit / status / jobs interface as JobQueue. The server process
+    is the __main__ its workers re-import, so the caller's never is. It
+    stops when its stdin closes (shutdown, or this process exiting), after
+    the jobs already submitted have finished.
+    """
+
+    def __init__(self, model_path, jobs_dir='jobs', workers=2, chunk_size=50_000,
+                 rules_path=None):
+        self.model_path = model_path
+        self.jobs_dir = jobs_dir
+        # Each server reads its own inbox, so a replaced server never picks up
+        # jobs meant for the new one
+        self.inbox = os.path.join(jobs_dir, 'inbox', uuid.uuid4().hex)
+        os.makedirs(self.inbox)
+        command = [sys.executable, os.path.abspath(__file__), '--serve', self.inbox,
+                   '--model', model_path, '--jobs-dir', jobs_dir,
+                   '--workers', str(workers), '--chunk-size', str(chunk_size)]
+        if rules_path:
+            command += ['--rules', rules_path]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def submit(self, input_path, job_id=None):
+        """Queue input_path for scoring and return the new job's id."""
+        job_id = create_job(self.jobs_dir, input_path, self.model_path, job_id)
+        # An empty file, created in one step; the name orders the inbox
+        open(os.path.join(self.inbox, f"{time.time_ns()}-{job_id}"), 'x').close()
+        return job_id
+
+    def status(self, job_id):
+        return job_status(self.jobs_dir, job_id)
+
+    def jobs(self):
+        return list_jobs(self.jobs_dir)
+
+    def shutdown(self, wait=True):
+        self._process.stdin.close()
+        if wait:
+            self._process.wait()
+
+
+def serve(queue, inbox, poll_seconds=0.2):
+    """Enqueue the jobs a JobServer drops into inbox until stdin is closed,
+    then wait for them to finish."""
+    closed = threading.Event()
+    threading.Thread(target=lambda: (sys.stdin.read(), closed.set()), daemon=True).start()
+    while True:
+        # Checked before the inbox is read, so the last requests are drained
+        stopping = closed.is_set()
+        for name in sorted(os.listdir(inbox)):
+            os.remove(os.path.join(inbox, name))
+            queue.enqueue(name.split('-', 1)[1])
+        if stopping:
+            break
+        closed.wait(poll_seconds)
+    queue.shutdown()
+    os.rmdir(inbox)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background scoring jobs")
+    parser.add_argument('inputs', nargs='*', help="BRFSS-shaped .csv or .parquet files")
+    parser.add_argument('--model', default='best_rf_model.rnf',
+                        help=".rnf artifact or pickled Random Forest")
+    parser.add_argument('--rules', help="JSON rule table (built-in rules when omitted)")
+    parser.add_argument('--jobs-dir', default='jobs')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--chunk-size', type=int, default=50_000, help="Rows per chunk")
+    parser.add_argument('--serve', metavar='INBOX',
+                        help="Run as a JobServer's process, taking jobs from INBOX")
+    args = parser.parse_args()
+
+    queue = JobQueue(args.model, args.jobs_dir, args.workers, args.chunk_size, args.rules)
+    if args.serve:
+        serve(queue, args.serve)
+        return
+    if not args.inputs:
+        parser.error("no input files given")
+
+    print("=" * 70)
+    print("  HEART DISEASE PREDICTION - BACKGROUND SCORING JOBS")
+    print("=" * 70)
+
+    job_ids = [queue.submit(path) for path in args.inputs]
+    print(f"\nQueued {len(job_ids)} job(s) on {args.workers} worker process(es)\n")
+
+    try:
+        while True:
+            statuses = [queue.status(job_id) for job_id in job_ids]
+            for s in statuses:
+                rate = f"{s['rows_per_sec']:,.0f} rows/sec" if s['rows_per_sec'] else "-"
+                print(f"  {s['job_id']}  {s['state']:<9} {s['progress']:5.1f}%  {rate}")
+            if all(s['state'] in ('completed', 'failed') for s in statuses):
+                break
+            print()
+            time.sleep(1.0)
+    finally:
+        queue.shutdown()
+
+    for s in statuses:
+        if s['state'] == 'completed':
+            print(f"\n✓ {s['job_id']}: {s['rows_done']:,} rows in {s['seconds']:.2f}s → '{s['output']}'")
+        else:
+            print(f"\n❌ {s['job_id']}: {s.get('error')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+Headless JSON scoring service for EHR integrations.
+A small asyncio HTTP/1.1 server (standard library only) backed by the same
+RuleNetClassifier and feature encoding as app.py. The model is loaded once at
+startup, and concurrent requests are coalesced by a MicroBatcher into one
+predict_proba call.
+
+Endpoints:
+    GET  /health          -> {"status": "ok", ...}
+    GET  /metrics         -> micro-batching fill ratio and queueing delay, rule hits,
+                             forest deferrals and rules / forest latency histograms
+    POST /predict         body: one patient record    -> {"probability": .., "prediction": ..}
+    POST /predict/batch   body: {"records": [...]}    -> {"results": [...]}
+    POST /jobs            body: {"input": "<CSV/Parquet path on this host>"} -> {"job_id": ..}
+    GET  /jobs            -> status of every background scoring job
+    GET  /jobs/<job_id>   -> state, progress, throughput and result path of one job
+
+Records use the BRFSS field names and values of the tab1 form, e.g.
+{"BMI": 31.2, "Smoking": "Yes", "AgeCategory": "60-64", "Race": "White", ...}
+
+Background jobs (see scoring_jobs.py) are enabled with --job-workers N.
+
+Usage: python serve_api.py --port 8000
+       curl -X POST localhost:8000/predict -d @patient.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import pickle
+
+from feature_schema import encode_records
+from flat_forest import FlatForest
+from micro_batcher import MicroBatcher
+from model_artifact import load_artifact, process_memory_report, format_memory_report
+from rulenet import RuleNetClassifier, load_rules
+from scoring_jobs import JOB_ID_PATTERN, JobQueue
+
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 500: 'Internal Server Error',
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ScoringServer:
+    def __init__(self, model, model_path, job_queue=None):
+        self.model = model
+        self.model_path = model_path
+        self.job_queue = job_queue
+        # Small flush window; batch requests larger than max_batch_size go alone
+        self.batcher = MicroBatcher(model, max_batch_size=256, max_wait_ms=2.0)
+
+    def encode_records(self, records):
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise HTTPError(400, "Expected a JSON object or a list of objects")
+        try:
+            # Records are already dicts: encoding them row by row is cheaper
+            # than building a DataFrame (see benchmark_encoding.py). A fresh
+            # array per request, since the micro-batcher's worker reads it later
+            return encode_records(records)
+        except (ValueError, TypeError) as exc:
+            raise HTTPError(400, str(exc))
+
+    @staticmethod
+    def format_result(proba):
+        return {'probability': float(proba[1]), 'prediction': int(proba[1] > 0.5)}
+
+    async def dispatch(self, method, path, body):
+        if path == '/health':
+            if method != 'GET':
+                raise HTTPError(405, "Use GET")
+            return {'status': 'ok', 'model': self.model_path}
+        if path == '/metrics':
+            if method != 'GET':
+                raise HTTPError(405, "Use GET")
+            return {'batching': self.batcher.stats(), 'rulenet': self.model.rule_stats()}
+
+        if path == '/jobs' or path.startswith('/jobs/'):
+            return self.dispatch_jobs(method, path, body)
+
+        if path not in ('/predict', '/predict/batch'):
+            raise HTTPError(404, f"Unknown endpoint {path}")
+        if method != 'POST':
+            raise HTTPError(405, "Use POST")
+
+        try:
+            payload = json.loads(body or b'null')
+        except json.JSONDecodeError as exc:
+            raise HTTPError(400, f"Invalid JSON: {exc}")
+
+        if path == '/predict':
+            X = self.encode_records([payload])
+            probas = await asyncio.wrap_future(self.batcher.submit(X))
+            return self.format_result(probas[0])
+
+        records = payload.get('records') if isinstance(payload, dict) else None
+        if not records:
+            return {'results': []}
+        X = self.encode_records(records)
+        probas = await asyncio.wrap_future(self.batcher.submit(X))
+        return {'results': [self.format_result(p) for p in probas]}
+
+    def dispatch_jobs(self, method, path, body):
+        if self.job_queue is None:
+            raise HTTPError(404, "Background jobs are disabled (start with --job-workers)")
+        if path == '/jobs':
+            if method == 'GET':
+                return {'jobs': self.job_queue.jobs()}
+            if method != 'POST':
+                raise HTTPError(405, "Use GET or POST")
+            try:
+                payload = json.loads(body or b'null')
+            except json.JSONDecodeError as exc:
+                raise HTTPError(400, f"Invalid JSON: {exc}")
+            input_path = payload.get('input') if isinstance(payload, dict) else None
+            if not isinstance(input_path, str) or not os.path.isfile(input_path):
+                raise HTTPError(400, "Expected {\"input\": \"<existing CSV/Parquet path>\"}")
+            job_id = self.job_queue.submit(input_path)
+            return {'job_id': job_id, 'status_url': f'/jobs/{job_id}'}
+
+        if method != 'GET':
+            raise HTTPError(405, "Use GET")
+        job_id = path[len('/jobs/'):]
+        # The id becomes a path on disk, so only ids create_job could make are looked up
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            raise HTTPError(404, f"Unknown job {job_id}")
+        status = self.job_queue.status(job_id)
+        if status is None:
+            raise HTTPError(404, f"Unknown job {job_id}")
+        return status
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                request = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (len(request) == 3 and request[2] == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                try:
+                    # Without a valid request line or body length the next
+                    # request cannot be found, so these also close the connection
+                    if len(request) != 3:
+                        keep_alive = False
+                        raise HTTPError(400, "Malformed request line")
+                    method, target, _ = request
+                    length = headers.get('content-length', '0')
+                    if not length.isdigit():
+                        keep_alive = False
+                        raise HTTPError(400, f"Invalid Content-Length: {length!r}")
+                    length = int(length)
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise HTTPError(413, f"Body exceeds {MAX_BODY_BYTES} bytes")
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = 200, await self.dispatch(method, target.split('?')[0], body)
+                except HTTPError as exc:
+                    status, payload = exc.status, {'error': exc.message}
+                except Exception as exc:
+                    status, payload = 500, {'error': str(exc)}
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"✓ Serving on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def load_model(model_path, rules_path=None):
+    rules = load_rules(rules_path) if rules_path else None
+    if model_path.endswith('.rnf'):
+        forest, _ = load_artifact(model_path)
+        return RuleNetClassifier(forest, rules)
+    with open(model_path, 'rb') as f:
+        rf_model = pickle.load(f)
+    return RuleNetClassifier(FlatForest.from_sklearn(rf_model), rules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Heart disease risk scoring API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--model', default='best_rf_model.pkl',
+                        help="Pickled Random Forest or .rnf artifact")
+    parser.add_argument('--rules', help="JSON rule table (built-in rules when omitted)")
+    parser.add_argument('--job-workers', type=int, default=0,
+                        help="Worker processes for background jobs (0 disables /jobs)")
+    parser.add_argument('--jobs-dir', default='jobs', help="Job status and results")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  HEART DISEASE PREDICTION - SCORING API")
+    print("=" * 70)
+
+    print(f"\nLoading model from '{args.model}'...")
+    job_queue = None
+    if args.job_workers > 0:
+        job_queue = JobQueue(args.model, args.jobs_dir, args.job_workers, rules_path=args.rules)
+        print(f"✓ Background jobs: {args.job_workers} worker process(es), results in '{args.jobs_dir}'")
+    server = ScoringServer(load_model(args.model, args.rules), args.model, job_queue)
+    memory = process_memory_report(args.model)
+    if memory is not None:
+        print(f"✓ {format_memory_report(memory)}")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        if job_queue is not None:
+            job_queue.shutdown(wait=False)
+
+
+if __name__ == '__main__':
+    main()
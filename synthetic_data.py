@@ -0,0 +1,161 @@
+"""
+Vectorized synthetic BRFSS-style data generator.
+Produces the 17-feature distribution and risk-score labels used by
+create_model_pkl.py, and can stream arbitrarily large corpora to disk in
+chunks for load testing the inference path.
+
+Output is deterministic for a given seed and chunk size; a single chunk of
+n rows with seed 42 is exactly the create_model_pkl.py training set.
+
+Usage: python synthetic_data.py corpus.parquet --rows 10000000
+       python synthetic_data.py corpus.csv --rows 1000000 --chunk-size 250000 --seed 7
+       python synthetic_data.py corpus.npy --rows 5000000
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from chunk_io import ChunkWriter
+from feature_schema import FEATURE_COLUMNS, FEATURE_DTYPES
+
+LABEL_COLUMN = 'HeartDisease'
+
+
+def generate_features(n_samples, rng):
+    """Draw an (n_samples, 17) float64 feature matrix from a RandomState."""
+    return np.column_stack([
+        rng.uniform(15, 50, n_samples),      # 0: BMI (15-50)
+        rng.randint(0, 2, n_samples),        # 1: Smoking (0=No, 1=Yes)
+        rng.randint(0, 2, n_samples),        # 2: AlcoholDrinking (0=No, 1=Yes)
+        rng.randint(0, 2, n_samples),        # 3: Stroke (0=No, 1=Yes)
+        rng.randint(0, 31, n_samples),       # 4: PhysicalHealth (0-30 days)
+        rng.randint(0, 31, n_samples),       # 5: MentalHealth (0-30 days)
+        rng.randint(0, 2, n_samples),        # 6: DiffWalking (0=No, 1=Yes)
+        rng.randint(0, 2, n_samples),        # 7: Sex (0=Female, 1=Male)
+        rng.randint(0, 13, n_samples),       # 8: AgeCategory (0-12)
+        rng.randint(0, 6, n_samples),        # 9: Race (0-5)
+        rng.randint(0, 4, n_samples),        # 10: Diabetic (0=No, 1=borderline, 2=Yes, 3=pregnancy)
+        rng.randint(0, 2, n_samples),        # 11: PhysicalActivity (0=No, 1=Yes)
+        rng.randint(0, 5, n_samples),        # 12: GenHealth (0-4)
+        rng.randint(4, 12, n_samples),       # 13: SleepTime (4-11 hours)
+        rng.randint(0, 2, n_samples),        # 14: Asthma (0=No, 1=Yes)
+        rng.randint(0, 2, n_samples),        # 15: KidneyDisease (0=No, 1=Yes)
+        rng.randint(0, 2, n_samples),        # 16: SkinCancer (0=No, 1=Yes)
+    ])
+
+
+def risk_labels(X, rng, noise=0.05):
+    """Risk-score labels for X, with a random threshold per row and label noise."""
+    n_samples = len(X)
+    bmi, physical, age, diabetic = X[:, 0], X[:, 4], X[:, 8], X[:, 10]
+    gen_health, sleep = X[:, 12], X[:, 13]
+
+    # Terms are added in a fixed order so the float sums are reproducible
+    risk_score = np.zeros(n_samples)
+
+    # Major risk factors
+    risk_score += np.where(bmi > 35, 0.30, 0.0)                 # Obesity (BMI > 35)
+    risk_score += np.where(bmi > 30, 0.15, 0.0)                 # Overweight (BMI > 30)
+    risk_score += np.where(X[:, 1] == 1, 0.35, 0.0)             # Smoking
+    risk_score += np.where(X[:, 3] == 1, 0.40, 0.0)             # Previous Stroke
+    risk_score += np.where(physical > 20, 0.25, 0.0)            # Very poor physical health
+    risk_score += np.where(physical > 15, 0.15, 0.0)            # Poor physical health
+
+    # Age risk (exponential with age)
+    risk_score += np.select([age >= 10, age >= 8, age >= 6], [0.35, 0.25, 0.15], 0.0)
+
+    # Chronic conditions
+    risk_score += np.select([diabetic >= 2, diabetic == 1], [0.30, 0.15], 0.0)
+    risk_score += np.where(X[:, 6] == 1, 0.20, 0.0)             # Difficulty walking
+    risk_score += np.where(X[:, 15] == 1, 0.25, 0.0)            # Kidney disease
+
+    # Lifestyle factors
+    risk_score += np.where(X[:, 2] == 1, 0.15, 0.0)             # Heavy alcohol
+    risk_score += np.where(X[:, 11] == 0, 0.10, 0.0)            # No physical activity
+
+    # General health
+    risk_score += np.select([gen_health == 4, gen_health == 3], [0.25, 0.15], 0.0)
+
+    # Sleep
+    risk_score += np.where((sleep < 6) | (sleep > 9), 0.10, 0.0)  # Poor sleep
+
+    # Mental health correlation
+    risk_score += np.where(X[:, 5] > 20, 0.15, 0.0)             # Poor mental health
+
+    # Assign heart disease label
+    threshold = 0.7 + rng.uniform(-0.2, 0.2, n_samples)  # Variable threshold
+    y = (risk_score > threshold).astype(int)
+
+    # Add some random noise for realism (random flips)
+    noise_indices = rng.choice(n_samples, size=int(n_samples * noise), replace=False)
+    y[noise_indices] = 1 - y[noise_indices]
+    return y
+
+
+def generate(n_samples, seed=42):
+    """Generate (X, y) in one shot."""
+    rng = np.random.RandomState(seed)
+    X = generate_features(n_samples, rng)
+    return X, risk_labels(X, rng)
+
+
+def iter_chunks(n_samples, chunk_size=500_000, seed=42):
+    """Yield (X, y) chunks from a single seeded stream."""
+    rng = np.random.RandomState(seed)
+    for start in range(0, n_samples, chunk_size):
+        X = generate_features(min(chunk_size, n_samples - start), rng)
+        yield X, risk_labels(X, rng)
+
+
+def write_dataset(path, n_samples, chunk_size=500_000, seed=42):
+    """Stream a generated dataset to .csv, .parquet or .npy (features + label column)."""
+    if path.endswith('.npy'):
+        # Pre-sized on disk, filled chunk by chunk through a memory map
+        out = np.lib.format.open_memmap(
+            path, mode='w+', dtype=np.float32, shape=(n_samples, len(FEATURE_COLUMNS) + 1)
+        )
+        start = 0
+        for X, y in iter_chunks(n_samples, chunk_size, seed):
+            out[start:start + len(X), :-1] = X
+            out[start:start + len(X), -1] = y
+            start += len(X)
+        out.flush()
+        del out
+        return
+
+    writer = ChunkWriter(path)
+    try:
+        for X, y in iter_chunks(n_samples, chunk_size, seed):
+            chunk = pd.DataFrame(X, columns=FEATURE_COLUMNS).astype(FEATURE_DTYPES)
+            chunk[LABEL_COLUMN] = y.astype(np.int8)
+            writer.write(chunk)
+    finally:
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic heart disease dataset")
+    parser.add_argument('output', help="Destination .csv, .parquet or .npy file")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Number of rows")
+    parser.add_argument('--chunk-size', type=int, default=500_000, help="Rows per chunk")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  SYNTHETIC DATA GENERATOR")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    write_dataset(args.output, args.rows, args.chunk_size, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ Wrote {args.rows:,} rows to '{args.output}' in {elapsed:.2f}s "
+          f"({os.path.getsize(args.output) / 1024 ** 2:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
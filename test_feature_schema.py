@@ -0,0 +1,48 @@
+"""
+Checks that feature_schema encodes labels with the codes the model is
+trained on (synthetic_data.risk_labels).
+
+Usage: python -m pytest test_feature_schema.py
+"""
+
+import numpy as np
+import pytest
+
+from feature_schema import CATEGORIES, FEATURE_COLUMNS, encode_record
+from synthetic_data import risk_labels
+
+DIABETIC = FEATURE_COLUMNS.index('Diabetic')
+
+# The codes risk_labels assumes: 1 adds 0.15 risk, 2 and 3 add 0.30
+TRAINER_DIABETIC_CODES = {
+    'No': 0,
+    'No, borderline diabetes': 1,
+    'Yes': 2,
+    'Yes (during pregnancy)': 3,
+}
+
+BASE_RECORD = {
+    'BMI': 25.0, 'Smoking': 'No', 'AlcoholDrinking': 'No', 'Stroke': 'No',
+    'PhysicalHealth': 0, 'MentalHealth': 0, 'DiffWalking': 'No', 'Sex': 'Female',
+    'AgeCategory': '18-24', 'Race': 'White', 'Diabetic': 'No', 'PhysicalActivity': 'Yes',
+    'GenHealth': 'Excellent', 'SleepTime': 7, 'Asthma': 'No', 'KidneyDisease': 'No',
+    'SkinCancer': 'No',
+}
+
+
+@pytest.mark.parametrize('label', CATEGORIES['Diabetic'])
+def test_diabetic_label_encodes_to_trainer_code(label):
+    X = encode_record(dict(BASE_RECORD, Diabetic=label))
+    assert X[0, DIABETIC] == TRAINER_DIABETIC_CODES[label]
+
+
+def test_trainer_risk_follows_diabetic_codes():
+    # Smoking (0.35) and no activity (0.10) put the base risk just under the
+    # lowest threshold (0.5), so only the Diabetic term moves the label
+    record = dict(BASE_RECORD, Smoking='Yes', PhysicalActivity='No')
+    rates = []
+    for label in ['No', 'No, borderline diabetes', 'Yes']:
+        X = np.repeat(encode_record(dict(record, Diabetic=label)), 5_000, axis=0)
+        rates.append(risk_labels(X, np.random.RandomState(0), noise=0.0).mean())
+    assert rates[0] == 0.0
+    assert rates[0] < rates[1] < rates[2]
@@ -0,0 +1,190 @@
+"""
+Incremental model refresh: warm-start the Random Forest on a new batch of
+labelled screening data instead of retraining on the full history.
+New trees are grown on the fresh batch only (sklearn warm_start) and the
+oldest trees are retired so the forest never exceeds --max-trees. Training
+cost therefore scales with the batch, not the accumulated data, and the
+model's size stays fixed.
+
+The refreshed forest replaces best_rf_model.pkl and best_rf_model.rnf
+atomically, so the app and the API pick it up on their next mtime check. A
+copy of every version is kept under model_versions/ for rollback. The
+artifact metadata records the version, the batch every tree was grown on and
+the update history.
+
+Before training, the current model scores the new batch. These are rows it
+has never seen, so this is an honest accuracy check of the outgoing version.
+
+Usage: python update_model.py --data screening_2024-06-01.csv
+       python update_model.py --samples 5000 --seed 101 --trees-per-update 20 --max-trees 100
+"""
+
+import argparse
+import os
+import pickle
+import shutil
+import time
+
+import numpy as np
+from sklearn.utils.class_weight import compute_sample_weight
+
+from feature_schema import FEATURE_COLUMNS, build_label_encoders
+from flat_forest import FlatForest
+from model_artifact import load_artifact, read_header, save_artifact
+from model_io import load_holdout
+
+
+def current_lineage(artifact_path, n_trees):
+    """(version, per-tree batch versions, update history) of the deployed artifact."""
+    metadata = read_header(artifact_path)['metadata'] if os.path.exists(artifact_path) else {}
+    version = metadata.get('version', 1)
+    tree_versions = metadata.get('tree_versions', [version] * n_trees)
+    return version, tree_versions, metadata.get('updates', [])
+
+
+def warm_start_update(rf_model, X, y, n_new_trees, max_trees, random_state):
+    """Grow n_new_trees on (X, y), then drop the oldest trees beyond max_trees.
+
+    Returns the number of trees retired. estimators_ is kept oldest first.
+    """
+    # A fresh seed per update: sklearn derives the new trees' seeds from
+    # random_state and the current tree count, which is the same after every
+    # retirement, so a fixed seed would grow the same bootstrap samples again.
+    # Class weights (e.g. 'balanced') are computed on this batch and passed
+    # as sample weights, since sklearn warns about class_weight on warm start.
+    class_weight = rf_model.class_weight
+    rf_model.set_params(warm_start=True, random_state=random_state, class_weight=None,
+                        n_estimators=len(rf_model.estimators_) + n_new_trees)
+    rf_model.fit(X, y, sample_weight=compute_sample_weight(class_weight, y))
+    rf_model.set_params(class_weight=class_weight)
+
+    retired = max(0, len(rf_model.estimators_) - max_trees)
+    if retired:
+        rf_model.estimators_ = rf_model.estimators_[retired:]
+    rf_model.set_params(n_estimators=len(rf_model.estimators_), warm_start=False)
+    return retired
+
+
+def validate_update(rf_model, classes, X, version_path):
+    """Raise RuntimeError unless the refreshed forest and its written artifact
+    score the batch with the original classes and agree with each other."""
+    probas = rf_model.predict_proba(X)
+    if not np.array_equal(rf_model.classes_, classes) or probas.shape != (len(X), len(classes)):
+        raise RuntimeError(f"Refreshed model has classes {rf_model.classes_.tolist()} and "
+                           f"probabilities of shape {probas.shape}; expected {classes.tolist()}")
+    if not np.all(np.isfinite(probas)):
+        raise RuntimeError("Refreshed model returns non-finite probabilities")
+    forest, _ = load_artifact(version_path, mmap=False)
+    if not np.array_equal(forest.predict_proba(X), probas):
+        raise RuntimeError(f"'{version_path}' does not reproduce the refreshed model")
+
+
+def save_pickle(path, obj):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the Random Forest on a new data batch")
+    parser.add_argument('--data', help="New labelled CSV/Parquet with a HeartDisease column "
+                                       "(a synthetic batch is generated when omitted)")
+    parser.add_argument('--samples', type=int, default=5000, help="Synthetic batch size")
+    parser.add_argument('--seed', type=int, default=101,
+                        help="Seed for the synthetic batch (use a new one per update)")
+    parser.add_argument('--model', default='best_rf_model.pkl', help="Pickled Random Forest")
+    parser.add_argument('--artifact', default='best_rf_model.rnf')
+    parser.add_argument('--trees-per-update', type=int, default=20)
+    parser.add_argument('--max-trees', type=int, default=100)
+    parser.add_argument('--versions-dir', default='model_versions')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  HEART DISEASE PREDICTION - INCREMENTAL MODEL UPDATE")
+    print("=" * 70)
+
+    timings = {}
+    stage_start = time.perf_counter()
+    with open(args.model, 'rb') as f:
+        rf_model = pickle.load(f)
+    version, tree_versions, updates = current_lineage(args.artifact, len(rf_model.estimators_))
+    new_version = version + 1
+    X, y = load_holdout(args.data, args.samples, args.seed)
+    X = X.astype(np.float32)
+    timings['Loading'] = time.perf_counter() - stage_start
+
+    print(f"\nCurrent model: version {version}, {len(rf_model.estimators_)} trees")
+    print(f"New batch: {args.data or f'synthetic (seed {args.seed})'}, {len(y):,} rows, "
+          f"{y.mean():.1%} positive")
+
+    # Fitting on a batch without every class would silently shrink classes_
+    classes = rf_model.classes_.copy()
+    absent = [c for c in classes.tolist() if c not in set(np.unique(y).tolist())]
+    if absent:
+        parser.error(f"the new batch has no rows of class {absent}; every class in "
+                     f"{classes.tolist()} is needed to grow trees that fit the forest")
+
+    stage_start = time.perf_counter()
+    accuracy_before = float((rf_model.predict(X) == y).mean())
+    timings['Scoring batch'] = time.perf_counter() - stage_start
+
+    print(f"\nGrowing {args.trees_per_update} trees on the new batch...")
+    stage_start = time.perf_counter()
+    retired = warm_start_update(rf_model, X, y, args.trees_per_update, args.max_trees,
+                                random_state=new_version)
+    timings['Training'] = time.perf_counter() - stage_start
+    tree_versions = (tree_versions + [new_version] * args.trees_per_update)[retired:]
+    accuracy_after = float((rf_model.predict(X) == y).mean())
+
+    print(f"✓ Version {new_version}: {len(rf_model.estimators_)} trees "
+          f"({args.trees_per_update} added, {retired} retired)")
+    print(f"  - Accuracy on the batch before update (unseen): {accuracy_before:.2%}")
+    print(f"  - Accuracy on the batch after update (trained on): {accuracy_after:.2%}")
+
+    stage_start = time.perf_counter()
+    updates = updates + [{
+        'version': new_version,
+        'data': args.data or f'synthetic (seed {args.seed})',
+        'rows': len(y),
+        'trees_added': args.trees_per_update,
+        'trees_retired': retired,
+        'accuracy_before': accuracy_before,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }]
+    os.makedirs(args.versions_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(args.artifact))[0]
+    version_path = os.path.join(args.versions_dir, f"{stem}-v{new_version}.rnf")
+    save_artifact(
+        version_path, FlatForest.from_sklearn(rf_model), FEATURE_COLUMNS, build_label_encoders(),
+        metadata={
+            'data': updates[-1]['data'],
+            'version': new_version,
+            'tree_versions': tree_versions,
+            'updates': updates,
+            'feature_importances': dict(zip(FEATURE_COLUMNS,
+                                            rf_model.feature_importances_.tolist())),
+            'params': rf_model.get_params(),
+            'created': updates[-1]['created'],
+        }
+    )
+    # The live files are only replaced once the new version checks out
+    validate_update(rf_model, classes, X, version_path)
+    save_pickle(args.model, rf_model)
+    # Copy to a temporary name, then rename over the live artifact
+    shutil.copyfile(version_path, args.artifact + '.tmp')
+    os.replace(args.artifact + '.tmp', args.artifact)
+    timings['Saving'] = time.perf_counter() - stage_start
+
+    print(f"\n✓ '{args.model}' and '{args.artifact}' updated; "
+          f"version kept as '{version_path}'")
+    print(f"  Tree ages (versions): {sorted(set(tree_versions))}")
+
+    print("\n⏱️ Stage Timings:")
+    for stage, seconds in timings.items():
+        print(f"  - {stage:<18s} {seconds:8.2f}s")
+    print(f"  - {'Total':<18s} {sum(timings.values()):8.2f}s")
+
+
+if __name__ == '__main__':
+    main()